@@ -0,0 +1,29 @@
+import os
+
+
+def add_output_args(parser, default_out_dir):
+    parser.add_argument("--out-dir", default=default_out_dir,
+                        help="Directory to store output images.")
+    parser.add_argument("--interactive", action="store_true",
+                        help="Also keep the figures open and show them at the end.")
+
+
+def import_pyplot(interactive):
+    # matplotlib dominates start-up time, so it is only imported once there is something to plot.
+    import matplotlib
+    if not interactive and not os.environ.get("MPLBACKEND"):
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def save_figure(fig, out_dir, name, interactive):
+    # Figures are saved as soon as they are drawn and closed in batch mode, so memory
+    # stays bounded by one figure instead of growing with every plot.
+    import matplotlib.pyplot as plt
+
+    out_path = os.path.join(out_dir, name)
+    fig.savefig(out_path, dpi=150)
+    print(f"Saved: {out_path}")
+    if not interactive:
+        plt.close(fig)
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import queue
+import shutil
+import subprocess
+from collections import deque
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+# Binaries live in build/cache/<hash>, so concurrent `make foot` calls (which clean first)
+# never touch each other's files.
+CACHE_ROOT = os.path.join(REPO_ROOT, "build", "cache")
+SOURCE_DIRS = ["foot", "hdc_infrastructure"]
+# Objects go through ccache when it is installed, so a cache miss still reuses unchanged translation units.
+USE_CCACHE = shutil.which("ccache") is not None
+# Last lines of a failing command that are repeated in the error message.
+TAIL_LINES = 20
+# Read size used when merging the per-config logs into output.txt.
+COPY_CHUNK = 1 << 20
+# Each running model is pinned to its own slice of cores (via taskset where available),
+# so the OpenMP teams of concurrent runs never compete for the same core.
+TASKSET = shutil.which("taskset")
+
+
+class ConfigRunError(RuntimeError):
+    # Raised by run_config; carries the failing configuration's log so it can still be merged.
+    def __init__(self, message, log_path):
+        super().__init__(message)
+        self.log_path = log_path
+
+
+def available_cores():
+    # The cores this process may run on; fewer than os.cpu_count() under taskset or a cgroup limit.
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parallel_runs(num_configs, cores_per_run=1):
+    return min(num_configs, max(1, len(available_cores()) // cores_per_run))
+
+
+def threads_per_run(runs):
+    # Each run's OpenMP threads and make jobs get an equal share of the cores.
+    return max(1, len(available_cores()) // runs)
+
+
+def make_jobs(default):
+    # MAKE_JOBS in the environment overrides the -j value, e.g. MAKE_JOBS=1 for a serial build.
+    value = os.environ.get("MAKE_JOBS")
+    return max(1, int(value)) if value else default
+
+
+def run_cmd(cmd, cwd, log_file, ok_codes=(0,), env=None, label=None):
+    # Output is streamed line by line into the log, so a crash still leaves a complete log;
+    # with a label, GA generation lines are echoed as live progress.
+    tail = deque(maxlen=TAIL_LINES)
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        env=env,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+    ) as proc:
+        for line in proc.stdout:
+            log_file.write(line)
+            tail.append(line)
+            if label and "GA generation" in line:
+                print(f"[{label}] {line.strip()}")
+        returncode = proc.wait()
+    log_file.flush()
+    if returncode not in ok_codes:
+        raise RuntimeError(f"Command failed: {' '.join(cmd)}\n{''.join(tail)}")
+    return returncode
+
+
+def core_slices(runs):
+    if not hasattr(os, "sched_getaffinity"):
+        return [None] * runs
+    cores = available_cores()
+    size = max(1, len(cores) // runs)
+    return [cores[i * size:(i + 1) * size] or None for i in range(runs)]
+
+
+class CoreSlots:
+    # Hands out one core slice per concurrently running model.
+    def __init__(self, runs):
+        self._free = queue.Queue()
+        for cores in core_slices(runs):
+            self._free.put(cores)
+
+    @contextmanager
+    def pinned(self, cmd):
+        cores = self._free.get()
+        try:
+            if TASKSET is None or not cores:
+                yield cmd
+            else:
+                yield [TASKSET, "-c", ",".join(str(core) for core in cores)] + cmd
+        finally:
+            self._free.put(cores)
+
+
+def find_model_binary(build_dir):
+    for name in ("modelFoot", "modelFoot.exe"):
+        path = os.path.join(build_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def build_cache_dir(make_vars):
+    # Binaries are keyed by the make variables plus the state of the C sources,
+    # so a cached build is only reused when a rebuild would produce the same thing.
+    fingerprint = [sorted(make_vars.items())]
+    source_files = [os.path.join(REPO_ROOT, "Makefile")]
+    for source_dir in SOURCE_DIRS:
+        for root, _, files in os.walk(os.path.join(REPO_ROOT, source_dir)):
+            source_files.extend(os.path.join(root, name) for name in files if name.endswith((".c", ".h")))
+    for path in sorted(source_files):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            fingerprint.append((os.path.relpath(path, REPO_ROOT), stat.st_mtime_ns, stat.st_size))
+    digest = hashlib.sha1(repr(fingerprint).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_ROOT, digest)
+
+
+def foot_build_cmd(make_vars, cache_dir, jobs, make="make"):
+    cache_dir_rel = os.path.relpath(cache_dir, REPO_ROOT).replace(os.sep, "/")
+    cmd = [make, f"-j{jobs}", "foot"] + [f"{key}={value}" for key, value in make_vars.items()]
+    cmd += [f"BINDIR={cache_dir_rel}", f"TARGET_FOOT={cache_dir_rel}/modelFoot"]
+    if USE_CCACHE:
+        cmd.append("USE_CCACHE=1")
+    return cmd
+
+
+def run_config(run_dir, make_vars, header, core_slots, threads, label=None):
+    # Builds (or reuses) modelFoot for make_vars and runs it on a free core slice.
+    # The log and the result CSV stay in run_dir until the caller merges them.
+    os.makedirs(run_dir, exist_ok=True)
+    log_path = os.path.join(run_dir, "output.txt")
+    results_path = os.path.join(run_dir, "results.csv")
+    if os.path.exists(results_path):
+        os.remove(results_path)
+
+    make_vars = dict(make_vars, RESULT_CSV_PATH=os.path.relpath(results_path, REPO_ROOT))
+    cache_dir = build_cache_dir(make_vars)
+    make_cmd = foot_build_cmd(make_vars, cache_dir, make_jobs(threads))
+    env = dict(os.environ)
+    # Always the per-run share: an OMP_NUM_THREADS from the caller would oversubscribe the pinned cores.
+    env["OMP_NUM_THREADS"] = str(threads)
+
+    try:
+        with open(log_path, "w", encoding="utf-8") as log_file:
+            log_file.write(f"\n{header}\n")
+
+            model_path = find_model_binary(cache_dir)
+            if model_path is None:
+                run_cmd(make_cmd, REPO_ROOT, log_file)
+                model_path = find_model_binary(cache_dir)
+            else:
+                log_file.write(f"Reusing cached build: {os.path.relpath(cache_dir, REPO_ROOT)}\n")
+            if not model_path:
+                raise FileNotFoundError("modelFoot binary not found after build")
+
+            with core_slots.pinned([model_path]) as cmd:
+                rc = run_cmd(cmd, REPO_ROOT, log_file, ok_codes=(0,), env=env, label=label)
+            if rc != 0:
+                log_file.write(f"Model exited with code {rc}\n")
+    except Exception as exc:
+        raise ConfigRunError(str(exc), log_path) from exc
+
+    return log_path, results_path
+
+
+def merge_run(pool, future, output, merged_results_path):
+    # Appends one finished configuration to output.txt and the merged results CSV.
+    try:
+        log_path, results_path = future.result()
+    except BaseException as exc:
+        # Stop the sweep at the first failure instead of draining the queue, and keep the
+        # failing configuration's log in output.txt as a sequential run would.
+        pool.shutdown(cancel_futures=True)
+        if isinstance(exc, ConfigRunError) and os.path.exists(exc.log_path):
+            append_log(exc.log_path, output)
+        raise
+    append_log(log_path, output)
+    append_results(results_path, merged_results_path)
+
+
+def append_log(log_path, dst):
+    # Raw bytes are copied in large chunks; the per-config log is already UTF-8.
+    with open(log_path, "rb") as src:
+        shutil.copyfileobj(src, dst, COPY_CHUNK)
+    dst.flush()
+
+
+def append_results(results_path, merged_path):
+    if not os.path.exists(results_path):
+        return
+    with open(results_path, "r", encoding="utf-8") as src:
+        lines = src.readlines()
+    # Each per-config CSV starts with its own header; keep only the first one.
+    if lines and os.path.exists(merged_path) and os.path.getsize(merged_path) > 0:
+        with open(merged_path, "r", encoding="utf-8") as existing:
+            if existing.readline() == lines[0]:
+                lines = lines[1:]
+    with open(merged_path, "a", encoding="utf-8") as dst:
+        dst.writelines(lines)
@@ -0,0 +1,73 @@
+import functools
+import importlib.util
+import os
+import re
+
+# One "key=value" entry of the comma separated info column, whitespace trimmed.
+INFO_RE = re.compile(r"\s*([^,=]+?)\s*=\s*([^,]*?)\s*(?:,|$)")
+
+# pyarrow is optional; when installed, pandas' multi-threaded CSV parser is used.
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+KEY_COLUMNS = ["num_levels", "vector_dimension", "scope", "dataset_id"]
+READ_COLUMNS = ["num_levels", "vector_dimension", "overall_accuracy", "info"]
+CACHE_SUFFIX = ".pkl"
+CHUNK_SIZE = 1_000_000  # rows parsed at once; bounds peak memory for large CSVs
+# Stored with the cached table; a cache written with other parser settings is parsed again.
+PARSER_SETTINGS = {"engine": CSV_ENGINE, "float_precision": "round_trip"}
+
+
+@functools.lru_cache(maxsize=8192)
+def parse_info(info_str):
+    # Info strings repeat across many (L, D) rows, so parsed results are memoized.
+    # A tuple of (key, value) pairs is returned because cached values must stay immutable.
+    return tuple(INFO_RE.findall(info_str)) if info_str else ()
+
+
+def info_field(info, key):
+    # Vectorized lookup of one key=value entry over a pandas Series of info strings.
+    pattern = rf"(?:^|,)\s*{re.escape(key)}\s*=\s*([^,]*?)\s*(?:,|$)"
+    return info.fillna("").astype(str).str.extract(pattern, expand=False)
+
+
+def load_rows(csv_path):
+    # pandas is only needed by the table loader, not by the info parsers above.
+    import pandas as pd
+
+    # The parsed table is cached next to the CSV and reused until the CSV changes.
+    cache_path = csv_path + CACHE_SUFFIX
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(csv_path):
+        df = pd.read_pickle(cache_path)
+        if df.attrs.get("parser") == PARSER_SETTINGS:
+            return df
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [name for name in READ_COLUMNS if name in header]
+    if CSV_ENGINE == "pyarrow":
+        # The pyarrow engine parses the selected columns in parallel but has no chunked mode.
+        chunks = [pd.read_csv(csv_path, usecols=usecols, engine="pyarrow")]
+    else:
+        # round_trip parses floats exactly like float(); the default fast parser can be off in the last digit.
+        chunks = pd.read_csv(csv_path, usecols=usecols, chunksize=CHUNK_SIZE, float_precision="round_trip")
+
+    # Only the compact parsed columns of each chunk are kept, never the whole raw file.
+    parts = []
+    for raw in chunks:
+        info = raw["info"] if "info" in raw else pd.Series("", index=raw.index)
+        parts.append(
+            pd.DataFrame(
+                {
+                    "num_levels": raw["num_levels"].astype(int),
+                    "vector_dimension": raw["vector_dimension"].astype(int),
+                    "scope": info_field(info, "scope").fillna("overall"),
+                    "dataset_id": pd.to_numeric(info_field(info, "dataset")).fillna(-1).astype(int),
+                    "overall_accuracy": raw["overall_accuracy"].astype(float),
+                }
+            )
+        )
+    df = pd.concat(parts, ignore_index=True)
+    df.attrs["parser"] = dict(PARSER_SETTINGS)
+    try:
+        df.to_pickle(cache_path)
+    except OSError as exc:
+        print(f"Could not write cache {cache_path}: {exc}")
+    return df
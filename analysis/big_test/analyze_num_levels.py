@@ -1,8 +1,16 @@
+import argparse
 import csv
 import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
+from _csv_utils import parse_info
+
+# Plot output helpers are shared by all analysis scripts.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from _plot_utils import add_output_args, save_figure  # noqa: E402
+
 CSV_NAME = "intermed_results.csv"
 ACC_FIELD = "overall_accuracy"  # or "class_average_accuracy"
 TARGET_DATASET = 1
@@ -11,22 +19,30 @@ TARGET_LEVELS = {41, 61}
 PHASES = ["preopt-test", "postopt-test"]
 
 
-def parse_info(info_str):
-    info = {}
-    if not info_str:
-        return info
-    parts = [p.strip() for p in info_str.split(",") if p.strip()]
-    for part in parts:
-        if "=" in part:
-            k, v = part.split("=", 1)
-            info[k.strip()] = v.strip()
-    return info
+def nan_meanstd(values, axis=0):
+    # Mean and std ignoring NaNs from one mask and one pass of sums; float64 accumulators
+    # keep E[x^2] - E[x]^2 accurate for the float32 accuracy cubes.
+    mask = ~np.isnan(values)
+    count = mask.sum(axis=axis)
+    filled = np.where(mask, values, 0.0)
+    total = filled.sum(axis=axis, dtype=np.float64)
+    total_sq = np.square(filled, dtype=np.float64).sum(axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        var = total_sq / count - mean * mean
+    return mean, np.sqrt(np.maximum(var, 0.0))
 
 
 def main():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     csv_path = os.path.join(base_dir, CSV_NAME)
 
+    parser = argparse.ArgumentParser(description="Plot accuracy over vector dimension for selected NUM_LEVELS.")
+    add_output_args(parser, os.path.join(base_dir, "plots"))
+    args = parser.parse_args()
+    if not args.interactive and not os.environ.get("MPLBACKEND"):
+        plt.switch_backend("Agg")
+
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"Missing file: {csv_path}")
 
@@ -36,9 +52,20 @@ def main():
     dataset_set = set()
 
     with open(csv_path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader, [])
+        missing = [name for name in ("num_levels", "vector_dimension", ACC_FIELD) if name not in header]
+        if missing:
+            print(f"Missing columns in {CSV_NAME}: {', '.join(missing)}")
+            return
+        idx_nl = header.index("num_levels")
+        idx_vd = header.index("vector_dimension")
+        idx_acc = header.index(ACC_FIELD)
+        idx_info = header.index("info") if "info" in header else None
         for row in reader:
-            info = parse_info(row.get("info", ""))
+            if len(row) < len(header):
+                continue
+            info = dict(parse_info(row[idx_info] if idx_info is not None else ""))
             phase = info.get("phase", None)
             if phase not in PHASES:
                 continue
@@ -48,10 +75,10 @@ def main():
             except (TypeError, ValueError):
                 continue
             try:
-                num_levels = int(row["num_levels"])
-                vector_dim = int(row["vector_dimension"])
-                acc = float(row[ACC_FIELD])
-            except (KeyError, ValueError):
+                num_levels = int(row[idx_nl])
+                vector_dim = int(row[idx_vd])
+                acc = float(row[idx_acc])
+            except ValueError:
                 continue
 
             level_set.add(num_levels)
@@ -68,22 +95,24 @@ def main():
         print("No usable rows found. Check CSV header and info field.")
         return
 
-    lvl_idx = {l: i for i, l in enumerate(levels)}
-    dim_idx = {d: i for i, d in enumerate(dims)}
-
-    data = {phase: np.full((len(levels), len(dims)), np.nan) for phase in PHASES}
+    data = {phase: np.full((len(levels), len(dims)), np.nan, dtype=np.float32) for phase in PHASES}
     datasets = sorted(dataset_set)
-    ds_idx = {d: i for i, d in enumerate(datasets)}
-    data_all = {phase: np.full((len(datasets), len(levels), len(dims)), np.nan) for phase in PHASES}
-
-    for dataset, num_levels, vector_dim, phase, acc in rows:
-        if TARGET_LEVELS and num_levels not in TARGET_LEVELS:
-            continue
-        i = lvl_idx[num_levels]
-        j = dim_idx[vector_dim]
-        data_all[phase][ds_idx[dataset], i, j] = acc
-        if dataset == TARGET_DATASET:
-            data[phase][i, j] = acc
+    data_all = {phase: np.full((len(datasets), len(levels), len(dims)), np.nan, dtype=np.float32) for phase in PHASES}
+
+    ds_col, lvl_col, dim_col, phase_col, acc_col = (np.asarray(col) for col in zip(*rows))
+    keep = np.isin(lvl_col, levels)
+    ds_col, phase_col, acc_col = ds_col[keep], phase_col[keep], acc_col[keep]
+    # Axes are sorted, so searchsorted maps every row to its array index in one pass.
+    di = np.searchsorted(datasets, ds_col)
+    li = np.searchsorted(levels, lvl_col[keep])
+    vi = np.searchsorted(dims, dim_col[keep])
+    is_target = ds_col == TARGET_DATASET
+
+    for phase in PHASES:
+        mask = phase_col == phase
+        data_all[phase][di[mask], li[mask], vi[mask]] = acc_col[mask]
+        mask &= is_target
+        data[phase][li[mask], vi[mask]] = acc_col[mask]
 
     print(f"Loaded {len(rows)} rows from {CSV_NAME}")
     print(f"Dataset: {TARGET_DATASET}")
@@ -92,8 +121,9 @@ def main():
     print(f"Vector_dimension: {dims}")
     print(f"Accuracy field: {ACC_FIELD}")
 
+    os.makedirs(args.out_dir, exist_ok=True)
     for i, lvl in enumerate(levels):
-        plt.figure()
+        fig = plt.figure()
         plt.plot(dims, data["preopt-test"][i], marker="o", label="Pre-opt test")
         plt.plot(dims, data["postopt-test"][i], marker="o", label="Post-opt test")
         plt.title(f"Accuracy vs VECTOR_DIMENSION (dataset {TARGET_DATASET}, NUM_LEVELS={lvl})")
@@ -101,18 +131,17 @@ def main():
         plt.ylabel("Accuracy")
         plt.grid(True)
         plt.legend()
+        save_figure(fig, args.out_dir, f"levels_{lvl}_dataset_{TARGET_DATASET}.png", args.interactive)
 
-    # Aggregate across all datasets: mean +/- std
+    # Aggregate across all datasets: mean +/- std, reduced once for all levels
+    stats = {phase: nan_meanstd(data_all[phase], axis=0) for phase in PHASES}
     for i, lvl in enumerate(levels):
-        pre_vals = data_all["preopt-test"][:, i, :]
-        post_vals = data_all["postopt-test"][:, i, :]
-
-        pre_mean = np.nanmean(pre_vals, axis=0)
-        pre_std = np.nanstd(pre_vals, axis=0)
-        post_mean = np.nanmean(post_vals, axis=0)
-        post_std = np.nanstd(post_vals, axis=0)
+        pre_mean = stats["preopt-test"][0][i]
+        pre_std = stats["preopt-test"][1][i]
+        post_mean = stats["postopt-test"][0][i]
+        post_std = stats["postopt-test"][1][i]
 
-        plt.figure()
+        fig = plt.figure()
         plt.plot(dims, pre_mean, marker="o", label="Pre-opt test (mean)")
         plt.fill_between(dims, pre_mean - pre_std, pre_mean + pre_std, alpha=0.2)
         plt.plot(dims, post_mean, marker="o", label="Post-opt test (mean)")
@@ -122,8 +151,10 @@ def main():
         plt.ylabel("Accuracy")
         plt.grid(True)
         plt.legend()
+        save_figure(fig, args.out_dir, f"levels_{lvl}_all_datasets.png", args.interactive)
 
-    plt.show()
+    if args.interactive:
+        plt.show()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,23 @@
-import csv
+import argparse
 import os
+import sys
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
 
+from _csv_utils import info_field
+
+# Plot output helpers are shared by all analysis scripts.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from _plot_utils import add_output_args, save_figure  # noqa: E402
+
 # -------------------------
 # CONFIG
 # -------------------------
 CSV_NAME = "results.csv"
 ACC_FIELD = "overall_accuracy"  # or "class_average_accuracy"
+CHUNK_SIZE = 1_000_000  # rows parsed at once; bounds peak memory for large CSVs
 
 # Expected phases in info field
 PHASES = {
@@ -22,16 +31,34 @@ PHASES = {
 # HELPERS
 # -------------------------
 
-def parse_info(info_str):
-    info = {}
-    if not info_str:
-        return info
-    parts = [p.strip() for p in info_str.split(",") if p.strip()]
-    for part in parts:
-        if "=" in part:
-            k, v = part.split("=", 1)
-            info[k.strip()] = v.strip()
-    return info
+def parse_rows(df):
+    df = pd.DataFrame({
+        "dataset": pd.to_numeric(info_field(df["info"], "dataset"), errors="coerce"),
+        "num_levels": pd.to_numeric(df["num_levels"], errors="coerce"),
+        "vector_dimension": pd.to_numeric(df["vector_dimension"], errors="coerce"),
+        "phase": info_field(df["info"], "phase"),
+        "acc": pd.to_numeric(df[ACC_FIELD], errors="coerce"),
+    })
+    df = df[df["phase"].isin(list(PHASES))].dropna()
+    return df.astype({"dataset": "int32", "num_levels": "int32", "vector_dimension": "int32"})
+
+
+def iter_rows(csv_path):
+    columns = ["num_levels", "vector_dimension", ACC_FIELD, "info"]
+    for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=CHUNK_SIZE):
+        yield parse_rows(chunk)
+
+
+def scatter_rows(rows, datasets, levels, dims, phase_to_array):
+    # Axes are sorted, so searchsorted maps every row to its cube index in one pass.
+    di = np.searchsorted(datasets, rows["dataset"].to_numpy())
+    li = np.searchsorted(levels, rows["num_levels"].to_numpy())
+    vi = np.searchsorted(dims, rows["vector_dimension"].to_numpy())
+    phase_col = rows["phase"].to_numpy()
+    acc = rows["acc"].to_numpy()
+    for phase, arr in phase_to_array.items():
+        mask = phase_col == phase
+        arr[di[mask], li[mask], vi[mask]] = acc[mask]
 
 
 def print_stats(name, arr, datasets, levels, dims):
@@ -58,65 +85,55 @@ def plot_dataset_surfaces(dataset_id, levels, dims, arrays, acc_field):
 
     for idx, (title, data) in enumerate(arrays, start=1):
         ax = fig.add_subplot(2, 2, idx, projection="3d")
-        Z = np.ma.masked_invalid(data)
-        ax.plot_surface(X, Y, Z, cmap="viridis", edgecolor="none", antialiased=True)
+        # plot_surface drops non-finite cells itself, so NaNs need no masked copy.
+        ax.plot_surface(X, Y, data, cmap="viridis", edgecolor="none", antialiased=True)
         ax.set_title(title)
         ax.set_xlabel("NUM_LEVELS")
         ax.set_ylabel("VECTOR_DIMENSION")
         ax.set_zlabel("Accuracy")
 
     fig.tight_layout()
+    return fig
 
 
 def main():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     csv_path = os.path.join(base_dir, CSV_NAME)
 
+    parser = argparse.ArgumentParser(description="Analyze big_test accuracies per dataset, level and dimension.")
+    add_output_args(parser, os.path.join(base_dir, "plots"))
+    args = parser.parse_args()
+    if not args.interactive and not os.environ.get("MPLBACKEND"):
+        plt.switch_backend("Agg")
+
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"Missing file: {csv_path}")
 
-    rows = []
-    datasets = set()
-    num_levels_set = set()
-    vector_dims_set = set()
-
-    with open(csv_path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            info = parse_info(row.get("info", ""))
-            dataset = info.get("dataset", None)
-            phase = info.get("phase", None)
-            if dataset is None or phase not in PHASES:
-                continue
-            try:
-                dataset = int(dataset)
-                num_levels = int(row["num_levels"])
-                vector_dim = int(row["vector_dimension"])
-                acc = float(row[ACC_FIELD])
-            except (KeyError, ValueError):
-                continue
-            datasets.add(dataset)
-            num_levels_set.add(num_levels)
-            vector_dims_set.add(vector_dim)
-            rows.append((dataset, num_levels, vector_dim, phase, acc))
-
-    datasets = sorted(datasets)
-    levels = sorted(num_levels_set)
-    dims = sorted(vector_dims_set)
-
-    if not rows:
+    # First pass only collects the axes so the cubes can be allocated up front.
+    row_count = 0
+    dataset_set = set()
+    level_set = set()
+    dim_set = set()
+    for rows in iter_rows(csv_path):
+        row_count += len(rows)
+        dataset_set.update(rows["dataset"].unique().tolist())
+        level_set.update(rows["num_levels"].unique().tolist())
+        dim_set.update(rows["vector_dimension"].unique().tolist())
+    datasets = sorted(dataset_set)
+    levels = sorted(level_set)
+    dims = sorted(dim_set)
+
+    if row_count == 0:
         print("No usable rows found. Check CSV header and info field.")
         return
 
     d_idx = {d: i for i, d in enumerate(datasets)}
-    l_idx = {l: i for i, l in enumerate(levels)}
-    v_idx = {v: i for i, v in enumerate(dims)}
 
     shape = (len(datasets), len(levels), len(dims))
-    preopt_val = np.full(shape, np.nan)
-    preopt_test = np.full(shape, np.nan)
-    postopt_val = np.full(shape, np.nan)
-    postopt_test = np.full(shape, np.nan)
+    preopt_val = np.full(shape, np.nan, dtype=np.float32)
+    preopt_test = np.full(shape, np.nan, dtype=np.float32)
+    postopt_val = np.full(shape, np.nan, dtype=np.float32)
+    postopt_test = np.full(shape, np.nan, dtype=np.float32)
 
     phase_to_array = {
         "preopt-val": preopt_val,
@@ -125,13 +142,10 @@ def main():
         "postopt-test": postopt_test,
     }
 
-    for dataset, num_levels, vector_dim, phase, acc in rows:
-        i = d_idx[dataset]
-        j = l_idx[num_levels]
-        k = v_idx[vector_dim]
-        phase_to_array[phase][i, j, k] = acc
+    for rows in iter_rows(csv_path):
+        scatter_rows(rows, datasets, levels, dims, phase_to_array)
 
-    print(f"Loaded {len(rows)} rows from {CSV_NAME}")
+    print(f"Loaded {row_count} rows from {CSV_NAME}")
     print(f"Datasets: {datasets}")
     print(f"Num_levels: {levels}")
     print(f"Vector_dimension: {dims}")
@@ -157,9 +171,10 @@ def main():
     print_stats("Post-pre test accuracy delta", delta_test, datasets, levels, dims)
 
     # 3D plots per dataset
+    os.makedirs(args.out_dir, exist_ok=True)
     for dataset in datasets:
         i = d_idx[dataset]
-        plot_dataset_surfaces(
+        fig = plot_dataset_surfaces(
             dataset,
             levels,
             dims,
@@ -171,6 +186,7 @@ def main():
             ],
             ACC_FIELD,
         )
+        save_figure(fig, args.out_dir, f"surfaces_dataset_{dataset}.png", args.interactive)
 
     # Delta plots (post - pre) for test set in one figure
     fig = plt.figure(figsize=(14, 9))
@@ -181,15 +197,16 @@ def main():
     for idx, dataset in enumerate(datasets, start=1):
         ax = fig.add_subplot(rows, cols, idx, projection="3d")
         i = d_idx[dataset]
-        Z = np.ma.masked_invalid(delta_test[i])
-        ax.plot_surface(X, Y, Z, cmap="coolwarm", edgecolor="none", antialiased=True)
+        ax.plot_surface(X, Y, delta_test[i], cmap="coolwarm", edgecolor="none", antialiased=True)
         ax.set_title(f"Dataset {dataset}")
         ax.set_xlabel("NUM_LEVELS")
         ax.set_ylabel("VECTOR_DIMENSION")
         ax.set_zlabel("Accuracy Delta")
     fig.tight_layout()
+    save_figure(fig, args.out_dir, "delta_test_all_datasets.png", args.interactive)
 
-    plt.show()
+    if args.interactive:
+        plt.show()
 
 
 if __name__ == "__main__":
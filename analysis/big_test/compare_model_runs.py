@@ -1,44 +1,32 @@
 import argparse
-import csv
 import os
-from collections import defaultdict
 
+import numpy as np
 
-def parse_info_field(info_value):
-    result = {}
-    if not info_value:
-        return result
-    for token in info_value.split(","):
-        token = token.strip()
-        if not token or "=" not in token:
-            continue
-        key, value = token.split("=", 1)
-        result[key.strip()] = value.strip()
-    return result
+try:
+    import pandas  # noqa: F401  # needed by _csv_utils.load_rows
+except ModuleNotFoundError as exc:
+    raise SystemExit(
+        "Missing dependency: pandas. Install with 'python -m pip install pandas'."
+    ) from exc
 
+from _csv_utils import KEY_COLUMNS, load_rows
 
-def load_results(csv_path):
-    grouped = defaultdict(list)
-    with open(csv_path, "r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            info = parse_info_field(row.get("info", ""))
-            scope = info.get("scope", "overall")
-            dataset = info.get("dataset")
-            dataset_id = int(dataset) if dataset is not None else -1
-
-            key = (
-                int(row["num_levels"]),
-                int(row["vector_dimension"]),
-                scope,
-                dataset_id,
-            )
-            grouped[key].append(float(row["overall_accuracy"]))
-    return grouped
+COMPARISON_COLUMNS = [
+    "num_levels",
+    "vector_dimension",
+    "scope",
+    "dataset_id",
+    "mine_mean_accuracy",
+    "krischan_mean_accuracy",
+    "delta_mine_minus_krischan",
+    "winner",
+]
 
 
-def mean(values):
-    return sum(values) / len(values) if values else 0.0
+def load_results(csv_path):
+    df = load_rows(csv_path)
+    return df.groupby(KEY_COLUMNS)["overall_accuracy"].mean()
 
 
 def format_key(key):
@@ -49,55 +37,20 @@ def format_key(key):
 
 
 def compare(mine, krischan, scope_filter, dataset_filter, eps):
-    rows = []
-    common_keys = sorted(set(mine.keys()) & set(krischan.keys()))
-    for key in common_keys:
-        num_levels, vector_dimension, scope, dataset_id = key
-        if scope_filter != "all" and scope != scope_filter:
-            continue
-        if dataset_filter is not None and dataset_id != dataset_filter:
-            continue
-
-        mine_mean = mean(mine[key])
-        kr_mean = mean(krischan[key])
-        delta = mine_mean - kr_mean
-        if delta > eps:
-            winner = "mine"
-        elif delta < -eps:
-            winner = "krischan"
-        else:
-            winner = "tie"
-
-        rows.append(
-            {
-                "num_levels": num_levels,
-                "vector_dimension": vector_dimension,
-                "scope": scope,
-                "dataset_id": dataset_id,
-                "mine_mean_accuracy": mine_mean,
-                "krischan_mean_accuracy": kr_mean,
-                "delta_mine_minus_krischan": delta,
-                "winner": winner,
-            }
-        )
-    return rows
-
-
-def write_comparison_csv(output_path, rows):
-    fieldnames = [
-        "num_levels",
-        "vector_dimension",
-        "scope",
-        "dataset_id",
-        "mine_mean_accuracy",
-        "krischan_mean_accuracy",
-        "delta_mine_minus_krischan",
-        "winner",
-    ]
-    with open(output_path, "w", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    merged = mine.to_frame("mine_mean_accuracy").join(
+        krischan.to_frame("krischan_mean_accuracy"), how="inner"
+    ).sort_index()
+    if scope_filter != "all":
+        merged = merged[merged.index.get_level_values("scope") == scope_filter]
+    if dataset_filter is not None:
+        merged = merged[merged.index.get_level_values("dataset_id") == dataset_filter]
+
+    delta = merged["mine_mean_accuracy"] - merged["krischan_mean_accuracy"]
+    merged = merged.assign(
+        delta_mine_minus_krischan=delta,
+        winner=np.where(delta > eps, "mine", np.where(delta < -eps, "krischan", "tie")),
+    )
+    return merged.reset_index()
 
 
 def main():
@@ -128,46 +81,48 @@ def main():
     krischan = load_results(args.krischan)
     rows = compare(mine, krischan, args.scope, args.dataset, args.eps)
 
-    if not rows:
+    if rows.empty:
         print("No overlapping cases found for the selected filters.")
         return
 
-    wins_mine = [r for r in rows if r["winner"] == "mine"]
-    wins_kr = [r for r in rows if r["winner"] == "krischan"]
-    ties = [r for r in rows if r["winner"] == "tie"]
+    wins_mine = rows[rows["winner"] == "mine"]
+    wins_kr = rows[rows["winner"] == "krischan"]
+    ties = rows[rows["winner"] == "tie"]
 
     print(f"Compared cases: {len(rows)}")
     print(f"Mine better: {len(wins_mine)}")
     print(f"Krischan better: {len(wins_kr)}")
     print(f"Tie: {len(ties)}")
 
-    overall_mine = mean([r["mine_mean_accuracy"] for r in rows])
-    overall_kr = mean([r["krischan_mean_accuracy"] for r in rows])
+    overall_mine = rows["mine_mean_accuracy"].mean()
+    overall_kr = rows["krischan_mean_accuracy"].mean()
     print(f"Mean accuracy across compared cases -> mine: {overall_mine:.4f}, krischan: {overall_kr:.4f}")
 
-    wins_mine_sorted = sorted(wins_mine, key=lambda r: r["delta_mine_minus_krischan"], reverse=True)
-    wins_kr_sorted = sorted(wins_kr, key=lambda r: r["delta_mine_minus_krischan"])
-
     top_n = max(0, args.top)
-    if top_n > 0 and wins_mine_sorted:
-        print(f"\nTop {min(top_n, len(wins_mine_sorted))} cases where mine is better:")
-        for row in wins_mine_sorted[:top_n]:
+    # Partial selection of the top-N rows instead of sorting every win case.
+    wins_mine_top = wins_mine.nlargest(top_n, "delta_mine_minus_krischan")
+    wins_kr_top = wins_kr.nsmallest(top_n, "delta_mine_minus_krischan")
+
+    if not wins_mine_top.empty:
+        print(f"\nTop {len(wins_mine_top)} cases where mine is better:")
+        for row in wins_mine_top.to_dict("records"):
             key = (row["num_levels"], row["vector_dimension"], row["scope"], row["dataset_id"])
             print(
                 f"  {format_key(key)} | mine={row['mine_mean_accuracy']:.4f} "
                 f"krischan={row['krischan_mean_accuracy']:.4f} delta={row['delta_mine_minus_krischan']:+.4f}"
             )
 
-    if top_n > 0 and wins_kr_sorted:
-        print(f"\nTop {min(top_n, len(wins_kr_sorted))} cases where Krischan is better:")
-        for row in wins_kr_sorted[:top_n]:
+    if not wins_kr_top.empty:
+        print(f"\nTop {len(wins_kr_top)} cases where Krischan is better:")
+        for row in wins_kr_top.to_dict("records"):
             key = (row["num_levels"], row["vector_dimension"], row["scope"], row["dataset_id"])
             print(
                 f"  {format_key(key)} | mine={row['mine_mean_accuracy']:.4f} "
                 f"krischan={row['krischan_mean_accuracy']:.4f} delta={row['delta_mine_minus_krischan']:+.4f}"
             )
 
-    write_comparison_csv(args.output, rows)
+    # csv.writer's "\r\n" line ending is kept so the file stays byte-identical to earlier runs.
+    rows[COMPARISON_COLUMNS].to_csv(args.output, index=False, lineterminator="\r\n")
     print(f"\nDetailed comparison saved to: {args.output}")
 
 
@@ -1,58 +1,34 @@
 import argparse
-import csv
 import os
-from collections import defaultdict
 
 try:
+    import matplotlib
+
+    if not os.environ.get("MPLBACKEND"):
+        matplotlib.use("Agg")  # figures are only saved, so skip the GUI backend
     import matplotlib.pyplot as plt
+    import pandas  # noqa: F401  # needed by _csv_utils.load_rows
 except ModuleNotFoundError as exc:
     raise SystemExit(
-        "Missing dependency: matplotlib. Install with 'python -m pip install matplotlib'."
+        f"Missing dependency: {exc.name}. Install with 'python -m pip install {exc.name}'."
     ) from exc
 
-
-def parse_info_field(info_value):
-    result = {}
-    if not info_value:
-        return result
-    for token in info_value.split(","):
-        token = token.strip()
-        if "=" not in token:
-            continue
-        key, value = token.split("=", 1)
-        result[key.strip()] = value.strip()
-    return result
-
-
-def mean(values):
-    return sum(values) / len(values) if values else float("nan")
+from _csv_utils import load_rows
 
 
 def load_accuracy_map(csv_path):
-    grouped = defaultdict(list)
-    levels = set()
-    dimensions = set()
-    scopes = set()
-
-    with open(csv_path, "r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            info = parse_info_field(row.get("info", ""))
-            scope = info.get("scope", "overall")
-            dataset = int(info["dataset"]) if "dataset" in info else -1
-
-            level = int(row["num_levels"])
-            dimension = int(row["vector_dimension"])
-            acc = float(row["overall_accuracy"])
-
-            key = (level, dimension, scope, dataset)
-            grouped[key].append(acc)
-            levels.add(level)
-            dimensions.add(dimension)
-            scopes.add((scope, dataset))
-
-    avg_map = {key: mean(values) for key, values in grouped.items()}
-    return avg_map, sorted(levels), sorted(dimensions), sorted(scopes)
+    df = load_rows(csv_path)
+    levels = sorted(df["num_levels"].unique().tolist())
+    dimensions = sorted(df["vector_dimension"].unique().tolist())
+    # One (scope, dataset, level) x dimension table holds every heatmap.
+    pivot = (
+        df.groupby(["scope", "dataset_id", "num_levels", "vector_dimension"])["overall_accuracy"]
+        .mean()
+        .unstack("vector_dimension")
+        .reindex(columns=dimensions)
+    )
+    scopes = pivot.index.droplevel("num_levels").unique().tolist()
+    return pivot, levels, dimensions, sorted(scopes)
 
 
 def build_scope_order(scopes):
@@ -76,7 +52,7 @@ def scope_label(scope, dataset):
 
 
 def plot_model_heatmaps(csv_path, title, out_path, vmin=0.0, vmax=1.0):
-    avg_map, levels, dimensions, scopes = load_accuracy_map(csv_path)
+    pivot, levels, dimensions, scopes = load_accuracy_map(csv_path)
     if not levels or not dimensions or not scopes:
         print(f"No plottable rows in: {csv_path}")
         return
@@ -93,21 +69,22 @@ def plot_model_heatmaps(csv_path, title, out_path, vmin=0.0, vmax=1.0):
     else:
         axes = [ax for line in axes for ax in line]
 
+    # Tick labels are identical for every panel, so they are formatted once.
+    x_labels = [str(d) for d in dimensions]
+    y_labels = [str(l) for l in levels]
     image = None
     for i, (scope, dataset) in enumerate(ordered_scopes):
-        matrix = []
-        for level in levels:
-            row = []
-            for dimension in dimensions:
-                row.append(avg_map.get((level, dimension, scope, dataset), float("nan")))
-            matrix.append(row)
+        matrix = pivot.loc[(scope, dataset)].reindex(index=levels).to_numpy()
 
         ax = axes[i]
-        image = ax.imshow(matrix, cmap="viridis", vmin=vmin, vmax=vmax, aspect="auto", origin="lower")
+        image = ax.imshow(
+            matrix, cmap="viridis", vmin=vmin, vmax=vmax, aspect="auto", origin="lower",
+            interpolation="nearest", rasterized=True,
+        )
         ax.set_xticks(range(len(dimensions)))
-        ax.set_xticklabels([str(d) for d in dimensions], rotation=45, ha="right")
+        ax.set_xticklabels(x_labels, rotation=45, ha="right")
         ax.set_yticks(range(len(levels)))
-        ax.set_yticklabels([str(l) for l in levels])
+        ax.set_yticklabels(y_labels)
         ax.set_xlabel("Vector Dimension")
         ax.set_ylabel("Num Levels")
         ax.set_title(scope_label(scope, dataset))
@@ -121,7 +98,7 @@ def plot_model_heatmaps(csv_path, title, out_path, vmin=0.0, vmax=1.0):
 
     fig.suptitle(title, fontsize=14)
     fig.tight_layout()
-    fig.savefig(out_path, dpi=180)
+    fig.savefig(out_path, dpi=120)
     plt.close(fig)
     print(f"Saved: {out_path}")
 
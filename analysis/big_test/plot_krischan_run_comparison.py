@@ -1,60 +1,47 @@
 import argparse
-import csv
 import os
-from collections import defaultdict
 
 try:
+    import matplotlib
+
+    if not os.environ.get("MPLBACKEND"):
+        matplotlib.use("Agg")  # figures are only saved, so skip the GUI backend
     import matplotlib.pyplot as plt
+    import numpy as np
+    from matplotlib.colors import Normalize
+    import pandas as pd
 except ModuleNotFoundError as exc:
     raise SystemExit(
-        "Missing dependency: matplotlib. Install with 'python -m pip install matplotlib'."
+        f"Missing dependency: {exc.name}. Install with 'python -m pip install {exc.name}'."
     ) from exc
 
+from _csv_utils import info_field
 
-def parse_info(info_value):
-    parsed = {}
-    if not info_value:
-        return parsed
-    for token in info_value.split(","):
-        token = token.strip()
-        if "=" not in token:
-            continue
-        key, value = token.split("=", 1)
-        parsed[key.strip()] = value.strip()
-    return parsed
-
-
-def mean(values):
-    return sum(values) / len(values) if values else float("nan")
+KEY_COLUMNS = ["num_levels", "vector_dimension", "scope", "dataset_id"]
+READ_COLUMNS = ["num_levels", "vector_dimension", "overall_accuracy", "info"]
 
 
 def load_accuracy_grid(csv_path, excluded_datasets=None):
     if excluded_datasets is None:
         excluded_datasets = set()
-    grouped = defaultdict(list)
-    levels = set()
-    dims = set()
-    scopes = set()
-
-    with open(csv_path, "r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            info = parse_info(row.get("info", ""))
-            scope = info.get("scope", "overall")
-            dataset_id = int(info["dataset"]) if "dataset" in info else -1
-            if scope == "dataset" and dataset_id in excluded_datasets:
-                continue
-            level = int(row["num_levels"])
-            dim = int(row["vector_dimension"])
-            acc = float(row["overall_accuracy"])
-
-            key = (level, dim, scope, dataset_id)
-            grouped[key].append(acc)
-            levels.add(level)
-            dims.add(dim)
-            scopes.add((scope, dataset_id))
-
-    avg = {k: mean(v) for k, v in grouped.items()}
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    df = pd.read_csv(
+        csv_path,
+        usecols=[name for name in READ_COLUMNS if name in header],
+        dtype={"num_levels": "int32", "vector_dimension": "int32", "overall_accuracy": "float64"},
+    )
+    info = df["info"] if "info" in df else pd.Series("", index=df.index)
+    df["scope"] = info_field(info, "scope").fillna("overall")
+    df["dataset_id"] = pd.to_numeric(info_field(info, "dataset")).fillna(-1).astype("int32")
+    excluded = (df["scope"] == "dataset") & df["dataset_id"].isin(list(excluded_datasets))
+    df = df[~excluded]
+
+    # Means stay a Series keyed by (level, dim, scope, dataset) instead of a dict of boxed floats.
+    avg = df.groupby(KEY_COLUMNS)["overall_accuracy"].mean()
+    levels = df["num_levels"].unique().tolist()
+    dims = df["vector_dimension"].unique().tolist()
+    scopes = set(zip(df["scope"].tolist(), df["dataset_id"].tolist()))
     return avg, sorted(levels), sorted(dims), scopes
 
 
@@ -76,22 +63,35 @@ def scope_label(scope, dataset_id):
 
 
 def value_range(a_map, b_map):
-    values = []
-    for key in set(a_map.keys()) | set(b_map.keys()):
-        a = a_map.get(key, float("nan"))
-        b = b_map.get(key, float("nan"))
-        if a == a and b == b:
-            values.append(a - b)
-    values = [v for v in values if v == v]  # filter NaN
-    if not values:
+    # Subtraction aligns on the key index; keys missing from either side become NaN.
+    values = a_map.sub(b_map).dropna()
+    if values.empty:
         return -0.1, 0.1
-    vmax = max(abs(min(values)), abs(max(values)))
+    vmax = max(abs(values.min()), abs(values.max()))
     if vmax == 0:
         vmax = 0.1
     return -vmax, vmax
 
 
-def draw_comparison_heatmap(current_map, previous_map, levels, dims, scopes, title, out_path, vmin, vmax):
+def dense_grid(acc_map, levels, dims, scopes):
+    # One reindex lays the means out as a (scope, level, dim) array; missing cells become NaN.
+    n_cells = len(levels) * len(dims)
+    scope_names = np.array([scope for scope, _ in scopes], dtype=object)
+    dataset_ids = np.array([dataset_id for _, dataset_id in scopes], dtype=np.int64)
+    index = pd.MultiIndex.from_arrays(
+        [
+            np.tile(np.repeat(levels, len(dims)), len(scopes)),
+            np.tile(dims, len(scopes) * len(levels)),
+            np.repeat(scope_names, n_cells),
+            np.repeat(dataset_ids, n_cells),
+        ],
+        names=KEY_COLUMNS,
+    )
+    grid = acc_map.reindex(index).to_numpy(dtype=np.float32)
+    return grid.reshape(len(scopes), len(levels), len(dims))
+
+
+def draw_comparison_heatmap(deltas, levels, dims, scopes, title, out_path, vmin, vmax):
     n = len(scopes)
     cols = 3
     rows = (n + cols - 1) // cols
@@ -103,27 +103,25 @@ def draw_comparison_heatmap(current_map, previous_map, levels, dims, scopes, tit
     else:
         axes = [ax for line in axes for ax in line]
 
+    # One shared norm for all panels; the colorbar below reflects every subplot.
+    norm = Normalize(vmin=vmin, vmax=vmax)
+    # Tick labels are identical for every panel, so they are formatted once.
+    x_labels = [str(d) for d in dims]
+    y_labels = [str(l) for l in levels]
     image = None
     for i, (scope, dataset_id) in enumerate(scopes):
-        matrix = []
-        for level in levels:
-            row = []
-            for dim in dims:
-                key = (level, dim, scope, dataset_id)
-                current = current_map.get(key, float("nan"))
-                previous = previous_map.get(key, float("nan"))
-                row.append(current - previous if current == current and previous == previous else float("nan"))
-            matrix.append(row)
-
         ax = axes[i]
-        image = ax.imshow(matrix, cmap="RdYlGn", vmin=vmin, vmax=vmax, origin="lower", aspect="auto")
+        image = ax.imshow(
+            deltas[i], cmap="RdYlGn", norm=norm, origin="lower", aspect="auto",
+            interpolation="nearest", rasterized=True,
+        )
         ax.set_title(scope_label(scope, dataset_id))
         ax.set_xlabel("Vector Dimension")
         ax.set_ylabel("Num Levels")
         ax.set_xticks(range(len(dims)))
-        ax.set_xticklabels([str(d) for d in dims], rotation=45, ha="right")
+        ax.set_xticklabels(x_labels, rotation=45, ha="right")
         ax.set_yticks(range(len(levels)))
-        ax.set_yticklabels([str(l) for l in levels])
+        ax.set_yticklabels(y_labels)
 
     for i in range(n, len(axes)):
         axes[i].axis("off")
@@ -141,7 +139,7 @@ def draw_comparison_heatmap(current_map, previous_map, levels, dims, scopes, tit
     )
     fig.suptitle(title, fontsize=14)
     fig.tight_layout()
-    fig.savefig(out_path, dpi=180)
+    fig.savefig(out_path, dpi=120)
     plt.close(fig)
     print(f"Saved: {out_path}")
 
@@ -153,55 +151,54 @@ def format_case(key):
     return f"L={level} D={dim} scope={scope}"
 
 
+def top_indices(scores, candidates, top_n):
+    # Indices of the top_n smallest scores among candidates, best first.
+    # argpartition picks them in O(K); only those are sorted.
+    if len(candidates) > top_n:
+        candidates = np.sort(candidates[np.argpartition(scores[candidates], top_n)[:top_n]])
+    return candidates[np.argsort(scores[candidates], kind="stable")]
+
+
 def print_text_analysis(current_map, previous_map, eps, top_n):
-    rows = []
-    for key in sorted(set(current_map.keys()) & set(previous_map.keys())):
-        current_acc = current_map[key]
-        previous_acc = previous_map[key]
-        if current_acc != current_acc or previous_acc != previous_acc:
-            continue
-        delta = current_acc - previous_acc
-        if delta > eps:
-            winner = "current"
-        elif delta < -eps:
-            winner = "previous"
-        else:
-            winner = "tie"
-        rows.append((key, current_acc, previous_acc, delta, winner))
-
-    current_better = [r for r in rows if r[4] == "current"]
-    previous_better = [r for r in rows if r[4] == "previous"]
-    ties = [r for r in rows if r[4] == "tie"]
-
-    print(f"Compared cases: {len(rows)}")
-    print(f"Current better: {len(current_better)}")
-    print(f"Previous better: {len(previous_better)}")
-    print(f"Ties: {len(ties)}")
-
-    if not rows:
+    both = pd.concat([current_map, previous_map], axis=1, join="inner").sort_index().dropna()
+    keys = both.index.tolist()
+    current_acc = both.iloc[:, 0].to_numpy(dtype=np.float64)
+    previous_acc = both.iloc[:, 1].to_numpy(dtype=np.float64)
+    deltas = current_acc - previous_acc
+
+    # 0 = current better, 1 = previous better, 2 = tie
+    winner = np.where(deltas > eps, 0, np.where(deltas < -eps, 1, 2))
+    n_current, n_previous, n_ties = np.bincount(winner, minlength=3)
+
+    print(f"Compared cases: {len(keys)}")
+    print(f"Current better: {n_current}")
+    print(f"Previous better: {n_previous}")
+    print(f"Ties: {n_ties}")
+
+    if not keys:
         return
 
     top_n = max(0, top_n)
     if top_n == 0:
         return
 
-    current_better.sort(key=lambda x: x[3], reverse=True)
-    previous_better.sort(key=lambda x: x[3])
+    current_better = top_indices(-deltas, np.flatnonzero(winner == 0), top_n)
+    previous_better = top_indices(deltas, np.flatnonzero(winner == 1), top_n)
 
-    if current_better:
-        print(f"\nTop {min(top_n, len(current_better))} cases where current is better:")
-        for key, current_acc, previous_acc, delta, _ in current_better[:top_n]:
+    if len(current_better):
+        print(f"\nTop {len(current_better)} cases where current is better:")
+        for i in current_better:
             print(
-                f"  {format_case(key)} | current={current_acc:.4f} "
-                f"previous={previous_acc:.4f} delta={delta:+.4f}"
+                f"  {format_case(keys[i])} | current={current_acc[i]:.4f} "
+                f"previous={previous_acc[i]:.4f} delta={deltas[i]:+.4f}"
             )
 
-    if previous_better:
-        print(f"\nTop {min(top_n, len(previous_better))} cases where previous is better:")
-        for key, current_acc, previous_acc, delta, _ in previous_better[:top_n]:
+    if len(previous_better):
+        print(f"\nTop {len(previous_better)} cases where previous is better:")
+        for i in previous_better:
             print(
-                f"  {format_case(key)} | current={current_acc:.4f} "
-                f"previous={previous_acc:.4f} delta={delta:+.4f}"
+                f"  {format_case(keys[i])} | current={current_acc[i]:.4f} "
+                f"previous={previous_acc[i]:.4f} delta={deltas[i]:+.4f}"
             )
 
 
@@ -245,9 +242,10 @@ def main():
     os.makedirs(args.out_dir, exist_ok=True)
     compare_out = os.path.join(args.out_dir, "accuracy_heatmap_krischan_current_vs_previous.png")
 
+    # NaN in either run propagates through the subtraction, leaving the cell blank.
+    deltas = dense_grid(current_map, levels, dims, scopes) - dense_grid(previous_map, levels, dims, scopes)
     draw_comparison_heatmap(
-        current_map,
-        previous_map,
+        deltas,
         levels,
         dims,
         scopes,
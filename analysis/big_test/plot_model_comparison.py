@@ -1,71 +1,64 @@
 import argparse
-import csv
 import os
 
 try:
     import matplotlib.pyplot as plt
+    import pandas as pd
+    from matplotlib.colors import Normalize
 except ModuleNotFoundError as exc:
     raise SystemExit(
-        "Missing dependency: matplotlib. Install with 'python -m pip install matplotlib'."
+        f"Missing dependency: {exc.name}. Install with 'python -m pip install {exc.name}'."
     ) from exc
 
+WINNERS = ["mine", "krischan", "tie"]
+
 
 def load_rows(csv_path):
-    rows = []
-    with open(csv_path, "r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            rows.append(
-                {
-                    "num_levels": int(row["num_levels"]),
-                    "vector_dimension": int(row["vector_dimension"]),
-                    "scope": row["scope"],
-                    "dataset_id": int(row["dataset_id"]),
-                    "delta": float(row["delta_mine_minus_krischan"]),
-                    "winner": row["winner"],
-                }
-            )
-    return rows
-
-
-def build_scope_key(row):
-    if row["scope"] == "overall":
-        return "overall"
-    return f"dataset_{row['dataset_id']}"
-
-
-def build_delta_matrix(rows, scope_key, levels, dimensions):
-    delta_lookup = {}
-    for row in rows:
-        if build_scope_key(row) != scope_key:
-            continue
-        delta_lookup[(row["num_levels"], row["vector_dimension"])] = row["delta"]
-
-    matrix = []
-    for level in levels:
-        line = []
-        for dimension in dimensions:
-            line.append(delta_lookup.get((level, dimension), float("nan")))
-        matrix.append(line)
-    return matrix
-
-
-def winner_counts(rows, scope_key):
-    counts = {"mine": 0, "krischan": 0, "tie": 0}
-    for row in rows:
-        if build_scope_key(row) != scope_key:
-            continue
-        counts[row["winner"]] = counts.get(row["winner"], 0) + 1
-    return counts
-
-
-def plot_heatmaps(rows, out_path):
-    levels = sorted({row["num_levels"] for row in rows})
-    dimensions = sorted({row["vector_dimension"] for row in rows})
-
-    scope_keys = ["overall"] + sorted(
-        {build_scope_key(row) for row in rows if build_scope_key(row) != "overall"}
+    df = pd.read_csv(
+        csv_path,
+        usecols=["num_levels", "vector_dimension", "scope", "dataset_id", "delta_mine_minus_krischan", "winner"],
+        dtype={
+            "num_levels": "int32",
+            "vector_dimension": "int32",
+            "dataset_id": "int32",
+            "scope": "category",
+            "winner": pd.CategoricalDtype(WINNERS),
+        },
+    )
+    df = df.rename(columns={"delta_mine_minus_krischan": "delta"})
+    # Low-cardinality labels are kept as categoricals so grouping hashes small integer codes.
+    df["scope_key"] = build_scope_keys(df).astype("category")
+    return df
+
+
+def build_scope_keys(rows):
+    dataset_keys = "dataset_" + rows["dataset_id"].astype(str)
+    return dataset_keys.where(rows["scope"] != "overall", "overall")
+
+
+def ordered_scope_keys(rows):
+    return ["overall"] + sorted(set(rows["scope_key"]) - {"overall"})
+
+
+def build_delta_matrices(rows, scope_keys, levels, dimensions):
+    # Pivot once into a (scope, level, dimension) array; later rows win like the old dict lookup.
+    pivot = rows.pivot_table(
+        index=["scope_key", "num_levels"], columns="vector_dimension", values="delta", aggfunc="last", observed=True
     )
+    full_index = pd.MultiIndex.from_product([scope_keys, levels])
+    pivot = pivot.reindex(index=full_index, columns=dimensions)
+    return pivot.to_numpy().reshape(len(scope_keys), len(levels), len(dimensions))
+
+
+def winner_counts(rows, scope_keys):
+    counts = rows.groupby(["scope_key", "winner"], observed=True).size().unstack(fill_value=0)
+    return counts.reindex(index=scope_keys, columns=WINNERS, fill_value=0)
+
+
+def plot_heatmaps(rows, scope_keys, out_path):
+    levels = sorted(rows["num_levels"].unique().tolist())
+    dimensions = sorted(rows["vector_dimension"].unique().tolist())
+
     if not scope_keys:
         print("No data found for heatmap.")
         return
@@ -81,19 +74,27 @@ def plot_heatmaps(rows, out_path):
     else:
         axes = [ax for line in axes for ax in line]
 
-    v_abs = max(abs(row["delta"]) for row in rows) if rows else 1.0
+    v_abs = rows["delta"].abs().max() if not rows.empty else 1.0
     if v_abs == 0:
         v_abs = 1.0
 
+    # One shared norm for all panels; the colorbar below reflects every subplot.
+    norm = Normalize(vmin=-v_abs, vmax=v_abs)
+    matrices = build_delta_matrices(rows, scope_keys, levels, dimensions)
+    # Tick labels are identical for every panel, so they are formatted once.
+    x_labels = [str(d) for d in dimensions]
+    y_labels = [str(l) for l in levels]
     for idx, scope_key in enumerate(scope_keys):
         ax = axes[idx]
-        matrix = build_delta_matrix(rows, scope_key, levels, dimensions)
-        image = ax.imshow(matrix, cmap="RdYlGn", vmin=-v_abs, vmax=v_abs, aspect="auto", origin="lower")
+        image = ax.imshow(
+            matrices[idx], cmap="RdYlGn", norm=norm, aspect="auto", origin="lower",
+            interpolation="nearest", rasterized=True,
+        )
 
         ax.set_xticks(range(len(dimensions)))
-        ax.set_xticklabels([str(d) for d in dimensions], rotation=45, ha="right")
+        ax.set_xticklabels(x_labels, rotation=45, ha="right")
         ax.set_yticks(range(len(levels)))
-        ax.set_yticklabels([str(l) for l in levels])
+        ax.set_yticklabels(y_labels)
         ax.set_xlabel("Vector Dimension")
         ax.set_ylabel("Num Levels")
         ax.set_title(f"Delta (mine - krischan): {scope_key}")
@@ -104,26 +105,19 @@ def plot_heatmaps(rows, out_path):
     cbar = fig.colorbar(image, ax=axes[:n], shrink=0.9)
     cbar.set_label("Accuracy difference")
     fig.tight_layout()
-    fig.savefig(out_path, dpi=180)
+    fig.savefig(out_path, dpi=120)
     plt.close(fig)
 
 
-def plot_winner_bars(rows, out_path):
-    scope_keys = ["overall"] + sorted(
-        {build_scope_key(row) for row in rows if build_scope_key(row) != "overall"}
-    )
+def plot_winner_bars(rows, scope_keys, out_path):
     if not scope_keys:
         print("No data found for winner bars.")
         return
 
-    mine_vals = []
-    krischan_vals = []
-    tie_vals = []
-    for scope_key in scope_keys:
-        counts = winner_counts(rows, scope_key)
-        mine_vals.append(counts.get("mine", 0))
-        krischan_vals.append(counts.get("krischan", 0))
-        tie_vals.append(counts.get("tie", 0))
+    counts = winner_counts(rows, scope_keys)
+    mine_vals = counts["mine"].tolist()
+    krischan_vals = counts["krischan"].tolist()
+    tie_vals = counts["tie"].tolist()
 
     x = list(range(len(scope_keys)))
     width = 0.27
@@ -154,7 +148,7 @@ def main():
     args = parser.parse_args()
 
     rows = load_rows(args.input)
-    if not rows:
+    if rows.empty:
         print("Input CSV has no rows.")
         return
 
@@ -162,8 +156,10 @@ def main():
     heatmap_path = os.path.join(args.out_dir, "comparison_heatmaps.png")
     bar_path = os.path.join(args.out_dir, "comparison_winner_counts.png")
 
-    plot_heatmaps(rows, heatmap_path)
-    plot_winner_bars(rows, bar_path)
+    # Scope keys are computed once per row at load time and ordered once for both plots.
+    scope_keys = ordered_scope_keys(rows)
+    plot_heatmaps(rows, scope_keys, heatmap_path)
+    plot_winner_bars(rows, scope_keys, bar_path)
 
     print(f"Saved heatmaps to: {heatmap_path}")
     print(f"Saved winner-count chart to: {bar_path}")
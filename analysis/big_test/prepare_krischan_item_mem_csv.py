@@ -1,8 +1,9 @@
 import argparse
 import os
-import subprocess
 import sys
 
+import numpy as np
+
 
 def convert_bitstrings_to_item_mem_csv(input_path, output_path, expected_vectors, expected_dimension):
     with open(input_path, "r", encoding="ascii") as handle:
@@ -13,33 +14,47 @@ def convert_bitstrings_to_item_mem_csv(input_path, output_path, expected_vectors
             f"{input_path} has {len(lines)} vectors, expected at least {expected_vectors}."
         )
 
+    rows = lines[:expected_vectors]
+    for row_idx, bits in enumerate(rows):
+        if len(bits) != expected_dimension:
+            raise RuntimeError(
+                f"{input_path} row {row_idx} has dimension {len(bits)}, expected {expected_dimension}."
+            )
+
+    # Validate and interleave the separators on the raw ASCII bytes of all rows at once.
+    bits = np.frombuffer("".join(rows).encode("ascii"), dtype=np.uint8)
+    bits = bits.reshape(expected_vectors, expected_dimension)
+    non_binary = ~((bits == ord("0")) | (bits == ord("1"))).all(axis=1)
+    if non_binary.any():
+        row_idx = int(np.argmax(non_binary))
+        raise RuntimeError(f"{input_path} row {row_idx} has non-binary characters.")
+
+    out = np.empty((expected_vectors, 2 * expected_dimension), dtype=np.uint8)
+    out[:, 0::2] = bits
+    out[:, 1::2] = ord(",")
+    out[:, -1] = ord("\n")
+
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="ascii", newline="\n") as handle:
-        handle.write(f"#item_mem,num_vectors={expected_vectors},dimension={expected_dimension}\n")
-        for row_idx in range(expected_vectors):
-            bits = lines[row_idx]
-            if len(bits) != expected_dimension:
-                raise RuntimeError(
-                    f"{input_path} row {row_idx} has dimension {len(bits)}, expected {expected_dimension}."
-                )
-            if set(bits) - {"0", "1"}:
-                raise RuntimeError(f"{input_path} row {row_idx} has non-binary characters.")
-            handle.write(",".join(bits) + "\n")
+    # Written to a temp file and renamed over the output: the output may be a hard link to
+    # the validate_consistency copy, which must not be truncated in place.
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(f"#item_mem,num_vectors={expected_vectors},dimension={expected_dimension}\n".encode("ascii"))
+        handle.write(out.tobytes())
+    os.replace(tmp_path, output_path)
 
 
 def regenerate_krischan_vectors(krischan_root, dimension, num_levels, num_features):
-    py = sys.executable
+    # Krischan's generator scripts are imported and run in this interpreter
+    # instead of being started as two separate Python processes.
     scripts_dir = os.path.join(krischan_root, "scripts")
-    subprocess.run(
-        [py, os.path.join(scripts_dir, "randomvector.py"), str(dimension), str(num_features)],
-        cwd=krischan_root,
-        check=True,
-    )
-    subprocess.run(
-        [py, os.path.join(scripts_dir, "bitflipvector.py"), str(dimension), str(num_levels)],
-        cwd=krischan_root,
-        check=True,
-    )
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+    import bitflipvector
+    import randomvector
+
+    randomvector.write_position_vectors(dimension, num_features, krischan_root)
+    bitflipvector.write_value_vectors(dimension, num_levels, krischan_root)
 
 
 def main():
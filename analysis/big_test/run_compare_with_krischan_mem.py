@@ -3,9 +3,15 @@ import shutil
 import subprocess
 import sys
 
+# The build-cache helpers are shared with the sweep runners.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from _runner_utils import build_cache_dir, find_model_binary, foot_build_cmd, make_jobs  # noqa: E402
 
 VECTOR_DIMENSIONS = [512, 1024, 2048, 4096, 8192]
 NUM_LEVELS_LIST = list(range(21, 152, 10))
+# Parallel compile jobs per build; the Makefile runs clean before compiling, so -j is safe.
+# Set MAKE_JOBS in the environment to override.
+MAKE_JOBS = make_jobs(os.cpu_count() or 1)
 
 
 def choose_make_command():
@@ -16,17 +22,6 @@ def choose_make_command():
     raise RuntimeError("No make command found (tried make and mingw32-make).")
 
 
-def find_binary(repo_root):
-    candidates = [
-        os.path.join(repo_root, "modelFoot"),
-        os.path.join(repo_root, "modelFoot.exe"),
-    ]
-    for path in candidates:
-        if os.path.exists(path):
-            return path
-    raise FileNotFoundError("modelFoot binary not found after build.")
-
-
 def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     repo_root = os.path.abspath(os.path.join(script_dir, "..", ".."))
@@ -62,19 +57,19 @@ def main():
                     check=True,
                 )
 
-                build_cmd = [
-                    make_cmd,
-                    "foot",
-                    "USE_OPENMP=1",
-                    "PRECOMPUTED_ITEM_MEMORY=0",
-                    "USE_GENETIC_ITEM_MEMORY=0",
-                    "VALIDATION_RATIO=0",
-                    "N_GRAM_SIZE=5",
-                    "MODEL_VARIANT=1",
-                    f"VECTOR_DIMENSION={vector_dimension}",
-                    f"NUM_LEVELS={num_levels}",
-                    f"RESULT_CSV_PATH={results_csv_rel}",
-                ]
+                make_vars = {
+                    "USE_OPENMP": "1",
+                    "PRECOMPUTED_ITEM_MEMORY": "0",
+                    "USE_GENETIC_ITEM_MEMORY": "0",
+                    "VALIDATION_RATIO": "0",
+                    "N_GRAM_SIZE": "5",
+                    "MODEL_VARIANT": "1",
+                    "VECTOR_DIMENSION": str(vector_dimension),
+                    "NUM_LEVELS": str(num_levels),
+                    "RESULT_CSV_PATH": results_csv_rel,
+                }
+                cache_dir = build_cache_dir(make_vars)
+                cache_dir_rel = os.path.relpath(cache_dir, repo_root).replace(os.sep, "/")
 
                 log_file.write(
                     f"\nRUN: VECTOR_DIMENSION={vector_dimension} "
@@ -83,8 +78,16 @@ def main():
                 )
                 log_file.flush()
 
-                subprocess.run(build_cmd, cwd=repo_root, stdout=log_file, stderr=log_file, check=True)
-                binary = find_binary(repo_root)
+                binary = find_model_binary(cache_dir)
+                if binary is None:
+                    build_cmd = foot_build_cmd(make_vars, cache_dir, MAKE_JOBS, make=make_cmd)
+                    subprocess.run(build_cmd, cwd=repo_root, stdout=log_file, stderr=log_file, check=True)
+                    binary = find_model_binary(cache_dir)
+                    if binary is None:
+                        raise FileNotFoundError("modelFoot binary not found after build.")
+                else:
+                    log_file.write(f"Reusing cached build: {cache_dir_rel}\n")
+                    log_file.flush()
                 subprocess.run([binary], cwd=repo_root, stdout=log_file, stderr=log_file, check=True)
 
     print(f"Done. Results in: {results_csv}")
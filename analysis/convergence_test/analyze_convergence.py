@@ -1,8 +1,15 @@
+import argparse
+import mmap
 import os
 import re
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Plot output helpers are shared by all analysis scripts.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from _plot_utils import add_output_args, save_figure  # noqa: E402
+
 OUTPUT_NAME = "output.txt"
 SHOW_STD = False
 SELECTION_LABELS = {
@@ -11,29 +18,56 @@ SELECTION_LABELS = {
     2: "Accuracy",
 }
 
+# Byte patterns so the log can be scanned straight from a memory map without decoding.
 HEADER_RE = re.compile(
-    r"NUM_LEVELS=(\d+)\s+VECTOR_DIMENSION=(\d+)\s+GA_SELECTION_MODE=(\d+)\s+GA_INIT_UNIFORM=(\d+)\s+GA_DEFAULT_GENERATIONS=(\d+)"
+    rb"NUM_LEVELS=(\d+)\s+VECTOR_DIMENSION=(\d+)\s+GA_SELECTION_MODE=(\d+)\s+GA_INIT_UNIFORM=(\d+)\s+GA_DEFAULT_GENERATIONS=(\d+)"
 )
-GEN_RE = re.compile(r"GA generation (\d+)/(\d+)")
-IND_RE = re.compile(r"individual \d+/\d+ accuracy: ([0-9.]+)%")
+GEN_RE = re.compile(rb"GA generation (\d+)/(\d+)")
+IND_RE = re.compile(rb"individual \d+/\d+ accuracy: ([0-9.]+)%")
+# One pass over the whole log: groups 1-5 header, 6-7 generation, 8 individual accuracy.
+LOG_RE = re.compile(b"|".join([HEADER_RE.pattern, GEN_RE.pattern, IND_RE.pattern]))
 
 
 def finalize_run(run):
-    if not run or not run.get("gen_acc"):
+    if not run or not run["max_gen"]:
         return None
-    max_gen = max(run["gen_acc"].keys())
-    means = np.full(max_gen, np.nan)
-    for gen, values in run["gen_acc"].items():
-        if values:
-            means[gen - 1] = float(np.mean(values))
-    run["mean_series"] = means
+    gens = np.asarray(run["acc_gen"], dtype=np.int64) - 1
+    accs = np.asarray(run["acc"], dtype=np.float64)
+    valid = gens >= 0
+    sums = np.bincount(gens[valid], weights=accs[valid], minlength=run["max_gen"])
+    counts = np.bincount(gens[valid], minlength=run["max_gen"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        run["mean_series"] = np.where(counts > 0, sums / counts, np.nan)
     return run
 
 
+def ragged_mean_std(series_list):
+    # NaN-aware mean/std per generation over runs of different length, computed
+    # from the concatenated series without padding them into a (runs, gens) stack.
+    lengths = np.array([len(s) for s in series_list])
+    data = np.concatenate(series_list)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    gen = np.arange(len(data)) - offsets
+    valid = ~np.isnan(data)
+    gen, data = gen[valid], data[valid]
+    n_gens = lengths.max()
+    counts = np.bincount(gen, minlength=n_gens)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(gen, weights=data, minlength=n_gens) / counts
+        var = np.bincount(gen, weights=(data - mean[gen]) ** 2, minlength=n_gens) / counts
+    return mean, np.sqrt(var)
+
+
 def main():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     path = os.path.join(base_dir, OUTPUT_NAME)
 
+    parser = argparse.ArgumentParser(description="Plot mean GA accuracy per generation from output.txt.")
+    add_output_args(parser, os.path.join(base_dir, "plots"))
+    args = parser.parse_args()
+    if not args.interactive and not os.environ.get("MPLBACKEND"):
+        plt.switch_backend("Agg")
+
     if not os.path.exists(path):
         raise FileNotFoundError(f"Missing file: {path}")
 
@@ -41,39 +75,35 @@ def main():
     current = None
     current_gen = None
 
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+    if os.path.getsize(path) == 0:
+        print("No runs found. Check output.txt format.")
+        return
 
-            header = HEADER_RE.search(line)
-            if header:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log:
+        for match in LOG_RE.finditer(log):
+            if match.group(1) is not None:
                 if current:
                     finalized = finalize_run(current)
                     if finalized:
                         runs.append(finalized)
                 current = {
-                    "num_levels": int(header.group(1)),
-                    "vector_dim": int(header.group(2)),
-                    "selection_mode": int(header.group(3)),
-                    "init_uniform": int(header.group(4)),
-                    "generations": int(header.group(5)),
-                    "gen_acc": {},
+                    "num_levels": int(match.group(1)),
+                    "vector_dim": int(match.group(2)),
+                    "selection_mode": int(match.group(3)),
+                    "init_uniform": int(match.group(4)),
+                    "generations": int(match.group(5)),
+                    "max_gen": 0,
+                    "acc_gen": [],
+                    "acc": [],
                 }
                 current_gen = None
-                continue
-
-            gen_match = GEN_RE.search(line)
-            if gen_match and current:
-                current_gen = int(gen_match.group(1))
-                current["gen_acc"].setdefault(current_gen, [])
-                continue
-
-            ind_match = IND_RE.search(line)
-            if ind_match and current and current_gen is not None:
-                acc = float(ind_match.group(1))
-                current["gen_acc"][current_gen].append(acc)
+            elif match.group(6) is not None:
+                if current:
+                    current_gen = int(match.group(6))
+                    current["max_gen"] = max(current["max_gen"], current_gen)
+            elif current and current_gen is not None:
+                current["acc_gen"].append(current_gen)
+                current["acc"].append(float(match.group(8)))
 
     if current:
         finalized = finalize_run(current)
@@ -89,38 +119,37 @@ def main():
         key = (run["init_uniform"], run["selection_mode"])
         grouped.setdefault(key, []).append(run["mean_series"])
 
+    os.makedirs(args.out_dir, exist_ok=True)
     for init_uniform in [0, 1]:
-        plt.figure()
         has_any = False
         modes_available = sorted({k[1] for k in grouped.keys() if k[0] == init_uniform})
         if not modes_available:
             continue
         print(f"Init_uniform={init_uniform}: modes found {modes_available}")
+        fig, ax = plt.subplots()
         for selection_mode in [0, 1, 2]:
             if selection_mode not in modes_available:
                 continue
-            series_list = grouped[(init_uniform, selection_mode)]
-            max_len = max(len(s) for s in series_list)
-            stack = np.full((len(series_list), max_len), np.nan)
-            for i, s in enumerate(series_list):
-                stack[i, :len(s)] = s
-            mean = np.nanmean(stack, axis=0)
-            std = np.nanstd(stack, axis=0)
+            mean, std = ragged_mean_std(grouped[(init_uniform, selection_mode)])
             x = np.arange(1, len(mean) + 1)
             label = SELECTION_LABELS.get(selection_mode, f"Mode {selection_mode}")
-            plt.plot(x, mean, label=label)
+            ax.plot(x, mean, label=label)
             if SHOW_STD:
-                plt.fill_between(x, mean - std, mean + std, alpha=0.2)
+                ax.fill_between(x, mean - std, mean + std, alpha=0.2)
             has_any = True
         if has_any:
             title = "Uniform init" if init_uniform == 1 else "Equal init"
-            plt.title(f"Mean accuracy per generation ({title})")
-            plt.xlabel("Generation")
-            plt.ylabel("Mean accuracy (%)")
-            plt.grid(True)
-            plt.legend()
-
-    plt.show()
+            ax.set_title(f"Mean accuracy per generation ({title})")
+            ax.set_xlabel("Generation")
+            ax.set_ylabel("Mean accuracy (%)")
+            ax.grid(True)
+            ax.legend()
+            save_figure(fig, args.out_dir, f"convergence_init{init_uniform}.png", args.interactive)
+        else:
+            plt.close(fig)
+
+    if args.interactive:
+        plt.show()
 
 
 if __name__ == "__main__":
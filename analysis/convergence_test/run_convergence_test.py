@@ -1,6 +1,17 @@
 import os
-import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# The build/run/merge helpers are shared by all sweep runners.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from _runner_utils import (  # noqa: E402
+    REPO_ROOT,
+    CoreSlots,
+    merge_run,
+    parallel_runs,
+    run_config,
+    threads_per_run,
+)
 
 VECTOR_DIMENSION = 1024
 NUM_LEVELS = 61
@@ -9,72 +20,53 @@ GA_SELECTION_MODES = [0, 1, 2]
 GA_INIT_UNIFORMS = [0, 1]
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-REPO_ROOT = os.path.abspath(os.path.join(BASE_DIR, "..", ".."))
 OUTPUT_PATH = os.path.join(BASE_DIR, "output.txt")
 RESULTS_PATH = os.path.join(BASE_DIR, "results.csv")
-RESULTS_PATH_REL = os.path.relpath(RESULTS_PATH, REPO_ROOT)
-
-MODEL_CANDIDATES = [
-    os.path.join(REPO_ROOT, "modelFoot"),
-    os.path.join(REPO_ROOT, "modelFoot.exe"),
-]
-
-
-def run_cmd(cmd, cwd, ok_codes=(0,), stdout=None, stderr=None):
-    result = subprocess.run(cmd, cwd=cwd, stdout=stdout, stderr=stderr)
-    if result.returncode not in ok_codes:
-        raise RuntimeError(f"Command failed: {' '.join(cmd)}")
-    return result.returncode
-
-
-def find_model_binary():
-    for path in MODEL_CANDIDATES:
-        if os.path.exists(path):
-            return path
-    return None
+# Every configuration logs to its own directory.
+BUILD_ROOT = os.path.join(REPO_ROOT, "build", "convergence_test")
+
+# Configurations run side by side on disjoint core slices.
+PARALLEL_RUNS = parallel_runs(len(GA_SELECTION_MODES) * len(GA_INIT_UNIFORMS))
+OMP_THREADS_PER_RUN = threads_per_run(PARALLEL_RUNS)
+
+
+def config_header(selection_mode, init_uniform):
+    return (
+        f"NUM_LEVELS={NUM_LEVELS} VECTOR_DIMENSION={VECTOR_DIMENSION} "
+        f"GA_SELECTION_MODE={selection_mode} GA_INIT_UNIFORM={init_uniform} "
+        f"GA_DEFAULT_GENERATIONS={GA_DEFAULT_GENERATIONS}"
+    )
+
+
+def run_ga_config(core_slots, selection_mode, init_uniform):
+    make_vars = {
+        "USE_OPENMP": "1",
+        "NUM_LEVELS": str(NUM_LEVELS),
+        "VECTOR_DIMENSION": str(VECTOR_DIMENSION),
+        "GA_SELECTION_MODE": str(selection_mode),
+        "GA_INIT_UNIFORM": str(init_uniform),
+        "GA_DEFAULT_GENERATIONS": str(GA_DEFAULT_GENERATIONS),
+    }
+    run_dir = os.path.join(BUILD_ROOT, f"sel{selection_mode}_init{init_uniform}")
+    # The label prefixes the GA progress lines echoed while the runs overlap.
+    label = f"sel={selection_mode} init={init_uniform}"
+    return run_config(
+        run_dir, make_vars, config_header(selection_mode, init_uniform), core_slots, OMP_THREADS_PER_RUN, label=label
+    )
 
 
 def main():
-    model_path = None
-
-    for selection_mode in GA_SELECTION_MODES:
-        for init_uniform in GA_INIT_UNIFORMS:
-            print(
-                f"NUM_LEVELS={NUM_LEVELS} VECTOR_DIMENSION={VECTOR_DIMENSION} "
-                f"GA_SELECTION_MODE={selection_mode} GA_INIT_UNIFORM={init_uniform} "
-                f"GA_DEFAULT_GENERATIONS={GA_DEFAULT_GENERATIONS}"
-            )
-
-            make_cmd = [
-                "make",
-                "foot",
-                "USE_OPENMP=1",
-                f"NUM_LEVELS={NUM_LEVELS}",
-                f"VECTOR_DIMENSION={VECTOR_DIMENSION}",
-                f"GA_SELECTION_MODE={selection_mode}",
-                f"GA_INIT_UNIFORM={init_uniform}",
-                f"GA_DEFAULT_GENERATIONS={GA_DEFAULT_GENERATIONS}",
-                f"RESULT_CSV_PATH={RESULTS_PATH_REL}",
-            ]
-
-            with open(OUTPUT_PATH, "a", encoding="utf-8") as log_file:
-                log_file.write(
-                    f"\nNUM_LEVELS={NUM_LEVELS} VECTOR_DIMENSION={VECTOR_DIMENSION} "
-                    f"GA_SELECTION_MODE={selection_mode} GA_INIT_UNIFORM={init_uniform} "
-                    f"GA_DEFAULT_GENERATIONS={GA_DEFAULT_GENERATIONS}\n"
-                )
-                log_file.flush()
-
-                run_cmd(make_cmd, REPO_ROOT, stdout=log_file, stderr=log_file)
-
-                if model_path is None:
-                    model_path = find_model_binary()
-                if not model_path:
-                    raise FileNotFoundError("modelFoot binary not found after build")
-
-                rc = run_cmd([model_path], REPO_ROOT, ok_codes=(0,), stdout=log_file, stderr=log_file)
-                if rc != 0:
-                    log_file.write(f"Model exited with code {rc}\n")
+    configs = [(mode, init) for mode in GA_SELECTION_MODES for init in GA_INIT_UNIFORMS]
+    for selection_mode, init_uniform in configs:
+        print(config_header(selection_mode, init_uniform))
+
+    core_slots = CoreSlots(PARALLEL_RUNS)
+    # output.txt stays open for the whole merge; each config's log is flushed once appended.
+    with ThreadPoolExecutor(max_workers=PARALLEL_RUNS) as pool, open(OUTPUT_PATH, "ab") as output:
+        futures = [pool.submit(run_ga_config, core_slots, mode, init) for mode, init in configs]
+        # Merge in sweep order so output.txt and results.csv keep the sequential layout.
+        for future in futures:
+            merge_run(pool, future, output, RESULTS_PATH)
 
 
 if __name__ == "__main__":
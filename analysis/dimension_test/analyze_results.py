@@ -1,7 +1,14 @@
-import csv
+import argparse
 import os
-import numpy as np
-import matplotlib.pyplot as plt
+import sys
+import pandas as pd
+
+# Plot output helpers are shared by all analysis scripts.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from _plot_utils import add_output_args, import_pyplot, save_figure  # noqa: E402
+# The info-column lookup is shared with the big_test scripts.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "big_test"))
+from _csv_utils import info_field  # noqa: E402
 
 CSV_NAME = "results.csv"
 ACC_FIELD = "overall_accuracy"  # or "class_average_accuracy"
@@ -14,70 +21,54 @@ PHASES = {
 }
 
 
-def parse_info(info_str):
-    info = {}
-    if not info_str:
-        return info
-    parts = [p.strip() for p in info_str.split(",") if p.strip()]
-    for part in parts:
-        if "=" in part:
-            k, v = part.split("=", 1)
-            info[k.strip()] = v.strip()
-    return info
+def load_rows(csv_path):
+    # One C-level parse plus a vectorized regex for the phase tag, instead of a dict per row.
+    # Missing columns come back as NaN and drop every row, like the old per-row KeyError skip.
+    columns = ["vector_dimension", ACC_FIELD, "info"]
+    df = pd.read_csv(csv_path, usecols=lambda name: name in columns).reindex(columns=columns)
+    rows = pd.DataFrame({
+        "vector_dimension": pd.to_numeric(df["vector_dimension"], errors="coerce"),
+        "phase": info_field(df["info"], "phase"),
+        "acc": pd.to_numeric(df[ACC_FIELD], errors="coerce"),
+    })
+    rows = rows[rows["phase"].isin(list(PHASES))].dropna()
+    return rows.astype({"vector_dimension": int})
 
 
 def main():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     csv_path = os.path.join(base_dir, CSV_NAME)
 
+    parser = argparse.ArgumentParser(description="Plot pre/post-optimization accuracies from results.csv.")
+    add_output_args(parser, os.path.join(base_dir, "plots"))
+    args = parser.parse_args()
+
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"Missing file: {csv_path}")
 
-    rows = []
-    dims_set = set()
-
-    with open(csv_path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            info = parse_info(row.get("info", ""))
-            phase = info.get("phase", None)
-            if phase not in PHASES:
-                continue
-            try:
-                vector_dim = int(row["vector_dimension"])
-                acc = float(row[ACC_FIELD])
-            except (KeyError, ValueError):
-                continue
-            dims_set.add(vector_dim)
-            rows.append((vector_dim, phase, acc))
-
-    dims = sorted(dims_set)
-    if not rows:
+    rows = load_rows(csv_path)
+    if rows.empty:
         print("No usable rows found. Check CSV header and info field.")
         return
 
-    dim_idx = {d: i for i, d in enumerate(dims)}
-    pre_test = np.full(len(dims), np.nan)
-    post_test = np.full(len(dims), np.nan)
-    pre_val = np.full(len(dims), np.nan)
-    post_val = np.full(len(dims), np.nan)
-
-    for vector_dim, phase, acc in rows:
-        i = dim_idx[vector_dim]
-        if phase == "preopt-test":
-            pre_test[i] = acc
-        elif phase == "postopt-test":
-            post_test[i] = acc
-        elif phase == "preopt-val":
-            pre_val[i] = acc
-        elif phase == "postopt-val":
-            post_val[i] = acc
+    # Later rows win, matching the previous row-by-row assignment.
+    pivot = rows.pivot_table(values="acc", index="vector_dimension", columns="phase", aggfunc="last")
+    pivot = pivot.reindex(columns=list(PHASES))
+    dims = pivot.index.tolist()
+    pre_test = pivot["preopt-test"].to_numpy()
+    post_test = pivot["postopt-test"].to_numpy()
+    pre_val = pivot["preopt-val"].to_numpy()
+    post_val = pivot["postopt-val"].to_numpy()
 
     print(f"Loaded {len(rows)} rows from {CSV_NAME}")
     print(f"Vector dimensions: {dims}")
     print(f"Accuracy field: {ACC_FIELD}")
 
-    plt.figure()
+    plt = import_pyplot(args.interactive)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    fig = plt.figure()
     plt.plot(dims, pre_test, marker="o", label="Pre-opt test")
     plt.plot(dims, post_test, marker="o", label="Post-opt test")
     plt.title("Test accuracy vs VECTOR_DIMENSION")
@@ -85,8 +76,9 @@ def main():
     plt.ylabel("Accuracy")
     plt.grid(True)
     plt.legend()
+    save_figure(fig, args.out_dir, "test_accuracy.png", args.interactive)
 
-    plt.figure()
+    fig = plt.figure()
     plt.plot(dims, pre_val, marker="o", label="Pre-opt val")
     plt.plot(dims, post_val, marker="o", label="Post-opt val")
     plt.title("Validation accuracy vs VECTOR_DIMENSION")
@@ -94,7 +86,10 @@ def main():
     plt.ylabel("Accuracy")
     plt.grid(True)
     plt.legend()
-    plt.show()
+    save_figure(fig, args.out_dir, "validation_accuracy.png", args.interactive)
+
+    if args.interactive:
+        plt.show()
 
 
 if __name__ == "__main__":
@@ -1,67 +1,52 @@
 import os
-import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# The build/run/merge helpers are shared by all sweep runners.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from _runner_utils import (  # noqa: E402
+    REPO_ROOT,
+    CoreSlots,
+    merge_run,
+    parallel_runs,
+    run_config,
+    threads_per_run,
+)
 
 VECTOR_DIMENSIONS = [256, 512, 1024, 3072, 4096, 5120, 6144, 7168, 8192]
 NUM_LEVELS = 61
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-REPO_ROOT = os.path.abspath(os.path.join(BASE_DIR, "..", ".."))
 OUTPUT_PATH = os.path.join(BASE_DIR, "output.txt")
 RESULTS_PATH = os.path.join(BASE_DIR, "results.csv")
-RESULTS_PATH_REL = os.path.relpath(RESULTS_PATH, REPO_ROOT)
+# Every dimension logs to its own directory.
+BUILD_ROOT = os.path.join(REPO_ROOT, "build", "dimension_test")
 
-MODEL_CANDIDATES = [
-    os.path.join(REPO_ROOT, "modelFoot"),
-    os.path.join(REPO_ROOT, "modelFoot.exe"),
-]
+# Dimensions run side by side on disjoint core slices.
+PARALLEL_RUNS = parallel_runs(len(VECTOR_DIMENSIONS), cores_per_run=2)
+OMP_THREADS_PER_RUN = threads_per_run(PARALLEL_RUNS)
 
 
-def run_cmd(cmd, cwd, ok_codes=(0,), stdout=None, stderr=None):
-    result = subprocess.run(cmd, cwd=cwd, stdout=stdout, stderr=stderr)
-    if result.returncode not in ok_codes:
-        raise RuntimeError(f"Command failed: {' '.join(cmd)}")
-    return result.returncode
-
-
-def find_model_binary():
-    for path in MODEL_CANDIDATES:
-        if os.path.exists(path):
-            return path
-    return None
+def run_dimension(core_slots, vector_dim):
+    make_vars = {
+        "USE_OPENMP": "1",
+        "NUM_LEVELS": str(NUM_LEVELS),
+        "VECTOR_DIMENSION": str(vector_dim),
+    }
+    header = f"NUM_LEVELS={NUM_LEVELS} VECTOR_DIMENSION={vector_dim}"
+    run_dir = os.path.join(BUILD_ROOT, f"dim{vector_dim}")
+    return run_config(run_dir, make_vars, header, core_slots, OMP_THREADS_PER_RUN)
 
 
 def main():
-    model_path = None
-
-    for vector_dim in VECTOR_DIMENSIONS:
-        print(f"NUM_LEVELS={NUM_LEVELS} VECTOR_DIMENSION={vector_dim}")
-
-        make_cmd = [
-            "make",
-            "foot",
-            "USE_OPENMP=1",
-            f"NUM_LEVELS={NUM_LEVELS}",
-            f"VECTOR_DIMENSION={vector_dim}",
-            f"RESULT_CSV_PATH={RESULTS_PATH_REL}",
-        ]
-
-        with open(OUTPUT_PATH, "a", encoding="utf-8") as log_file:
-            log_file.write(
-                f"\nNUM_LEVELS={NUM_LEVELS} VECTOR_DIMENSION={vector_dim}\n"
-            )
-            log_file.flush()
-
-            run_cmd(make_cmd, REPO_ROOT, stdout=log_file, stderr=log_file)
-
-            if model_path is None:
-                model_path = find_model_binary()
-            if not model_path:
-                raise FileNotFoundError("modelFoot binary not found after build")
-
-            rc = run_cmd([model_path], REPO_ROOT, ok_codes=(0,), stdout=log_file, stderr=log_file)
-            if rc != 0:
-                log_file.write(f"Model exited with code {rc}\n")
+    core_slots = CoreSlots(PARALLEL_RUNS)
+    # output.txt stays open for the whole merge; each config's log is flushed once appended.
+    with ThreadPoolExecutor(max_workers=PARALLEL_RUNS) as pool, open(OUTPUT_PATH, "ab") as output:
+        futures = [pool.submit(run_dimension, core_slots, vector_dim) for vector_dim in VECTOR_DIMENSIONS]
+        # Merge in sweep order so output.txt and results.csv keep the sequential layout.
+        for vector_dim, future in zip(VECTOR_DIMENSIONS, futures):
+            print(f"NUM_LEVELS={NUM_LEVELS} VECTOR_DIMENSION={vector_dim}")
+            merge_run(pool, future, output, RESULTS_PATH)
 
 
 if __name__ == "__main__":
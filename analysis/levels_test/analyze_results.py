@@ -1,7 +1,14 @@
-import csv
+import argparse
 import os
-import numpy as np
-import matplotlib.pyplot as plt
+import sys
+import pandas as pd
+
+# Plot output helpers are shared by all analysis scripts.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from _plot_utils import add_output_args, import_pyplot, save_figure  # noqa: E402
+# The info-column lookup is shared with the big_test scripts.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "big_test"))
+from _csv_utils import info_field  # noqa: E402
 
 CSV_NAME = "results.csv"
 ACC_FIELD = "overall_accuracy"  # or "class_average_accuracy"
@@ -12,64 +19,52 @@ PHASES = {
 }
 
 
-def parse_info(info_str):
-    info = {}
-    if not info_str:
-        return info
-    parts = [p.strip() for p in info_str.split(",") if p.strip()]
-    for part in parts:
-        if "=" in part:
-            k, v = part.split("=", 1)
-            info[k.strip()] = v.strip()
-    return info
+def load_rows(csv_path):
+    # One C-level parse plus a vectorized regex for the phase tag, instead of a dict per row.
+    # Missing columns come back as NaN and drop every row, like the old per-row KeyError skip.
+    columns = ["num_levels", ACC_FIELD, "info"]
+    df = pd.read_csv(csv_path, usecols=lambda name: name in columns).reindex(columns=columns)
+    rows = pd.DataFrame({
+        "num_levels": pd.to_numeric(df["num_levels"], errors="coerce"),
+        "phase": info_field(df["info"], "phase"),
+        "acc": pd.to_numeric(df[ACC_FIELD], errors="coerce"),
+    })
+    rows = rows[rows["phase"].isin(list(PHASES))].dropna()
+    return rows.astype({"num_levels": int})
 
 
 def main():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     csv_path = os.path.join(base_dir, CSV_NAME)
 
+    parser = argparse.ArgumentParser(description="Plot pre/post-optimization accuracies from results.csv.")
+    add_output_args(parser, os.path.join(base_dir, "plots"))
+    args = parser.parse_args()
+
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"Missing file: {csv_path}")
 
-    rows = []
-    levels_set = set()
-
-    with open(csv_path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            info = parse_info(row.get("info", ""))
-            phase = info.get("phase", None)
-            if phase not in PHASES:
-                continue
-            try:
-                num_levels = int(row["num_levels"])
-                acc = float(row[ACC_FIELD])
-            except (KeyError, ValueError):
-                continue
-            levels_set.add(num_levels)
-            rows.append((num_levels, phase, acc))
-
-    levels = sorted(levels_set)
-    if not rows:
+    rows = load_rows(csv_path)
+    if rows.empty:
         print("No usable rows found. Check CSV header and info field.")
         return
 
-    lvl_idx = {l: i for i, l in enumerate(levels)}
-    pre = np.full(len(levels), np.nan)
-    post = np.full(len(levels), np.nan)
-
-    for num_levels, phase, acc in rows:
-        i = lvl_idx[num_levels]
-        if phase == "preopt-test":
-            pre[i] = acc
-        elif phase == "postopt-test":
-            post[i] = acc
+    # Later rows win, matching the previous row-by-row assignment.
+    pivot = rows.pivot_table(values="acc", index="num_levels", columns="phase", aggfunc="last")
+    pivot = pivot.reindex(columns=list(PHASES))
+    levels = pivot.index.tolist()
+    pre = pivot["preopt-test"].to_numpy()
+    post = pivot["postopt-test"].to_numpy()
 
     print(f"Loaded {len(rows)} rows from {CSV_NAME}")
     print(f"Num_levels: {levels}")
     print(f"Accuracy field: {ACC_FIELD}")
 
-    plt.figure()
+    plt = import_pyplot(args.interactive)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    fig = plt.figure()
     plt.plot(levels, pre, marker="o", label="Pre-opt test")
     plt.plot(levels, post, marker="o", label="Post-opt test")
     plt.title("Test accuracy vs NUM_LEVELS")
@@ -77,7 +72,10 @@ def main():
     plt.ylabel("Accuracy")
     plt.grid(True)
     plt.legend()
-    plt.show()
+    save_figure(fig, args.out_dir, "test_accuracy.png", args.interactive)
+
+    if args.interactive:
+        plt.show()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pandas as pd
+
+# The info-column parser is shared with the big_test scripts.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "big_test"))
+from _csv_utils import parse_info  # noqa: E402
+
+RESULT_COLUMNS = ["num_levels", "vector_dimension", "overall_accuracy", "info"]
+GROUP_KEYS = ["num_levels", "vector_dimension", "scope", "dataset_id"]
+
+
+def parse_info_field(info_value):
+    # Only phase, scope and dataset are used, so they are returned as a tuple instead of a dict.
+    info = dict(parse_info(info_value))
+    return info.get("phase"), info.get("scope", "overall"), info.get("dataset")
+
+
+def read_results(csv_path):
+    # One C-level CSV parse; info strings repeat across many rows, so each distinct one
+    # is parsed once and mapped back onto its rows.
+    # round_trip parses floats exactly like float(); the default fast parser can be off in the last digit.
+    df = pd.read_csv(csv_path, usecols=lambda name: name in RESULT_COLUMNS, float_precision="round_trip")
+    info = df["info"].fillna("").astype(str) if "info" in df else pd.Series("", index=df.index)
+    unique_info = info.unique()
+    parsed = pd.DataFrame(
+        [parse_info_field(value) for value in unique_info],
+        index=unique_info,
+        columns=["phase", "scope", "dataset"],
+    ).reindex(info)
+    records = pd.DataFrame({
+        "num_levels": df["num_levels"].astype(int).to_numpy(),
+        "vector_dimension": df["vector_dimension"].astype(int).to_numpy(),
+        "scope": parsed["scope"].to_numpy(),
+        "dataset_id": pd.to_numeric(parsed["dataset"]).fillna(-1).astype(int).to_numpy(),
+        "phase": parsed["phase"].to_numpy(),
+        "accuracy": df["overall_accuracy"].astype(float).to_numpy(),
+    })
+    phases_found = sorted({phase for phase in records["phase"].dropna() if phase})
+    return records, phases_found
+
+
+def mean_results(records, phase_filter=None):
+    # Only enforce phase filter on rows that actually contain a phase tag.
+    if phase_filter is not None:
+        records = records[records["phase"].isna() | (records["phase"] == phase_filter)]
+    return records.groupby(GROUP_KEYS)["accuracy"].mean()
+
+
+def scope_names(rows):
+    dataset_keys = "dataset_" + rows["dataset_id"].astype(str)
+    return dataset_keys.where(rows["scope"] != "overall", "overall")
+
+
+def build_matrices(rows, values, scopes, levels, dims):
+    # Pivot once into a (scope, level, dim) stack; later rows win on duplicate cells, like the old dict lookup.
+    pivot = rows.pivot_table(
+        index=["scope_name", "num_levels"], columns="vector_dimension", values=values, aggfunc="last"
+    )
+    pivot = pivot.reindex(index=pd.MultiIndex.from_product([scopes, levels]), columns=dims)
+    return pivot.to_numpy().reshape(len(scopes), len(levels), len(dims))
@@ -1,17 +1,20 @@
 #!/usr/bin/env python3
 import argparse
-import csv
 import math
 import os
-from collections import defaultdict
 
 try:
     import matplotlib.pyplot as plt
+    import numpy as np
+    import pandas as pd
 except ModuleNotFoundError as exc:
     raise SystemExit(
-        "Missing dependency: matplotlib. Install with 'python -m pip install matplotlib'."
+        f"Missing dependency: {exc.name}. Install with 'python -m pip install {exc.name}'."
     ) from exc
 
+# The result reader and aggregation helpers are shared by both comparison scripts.
+from _results_utils import build_matrices, mean_results, read_results, scope_names
+
 KRISCHAN_BASELINE = os.path.join(
     os.path.dirname(os.path.abspath(__file__)),
     "krischan",
@@ -19,80 +22,15 @@ KRISCHAN_BASELINE = os.path.join(
 )
 
 
-def parse_info_field(info_value):
-    parsed = {}
-    if not info_value:
-        return parsed
-    for token in info_value.split(","):
-        token = token.strip()
-        if not token or "=" not in token:
-            continue
-        key, value = token.split("=", 1)
-        parsed[key.strip()] = value.strip()
-    return parsed
-
-
-def load_grouped_results(csv_path, phase_filter=None):
-    grouped = defaultdict(list)
-    phases_found = set()
-    with open(csv_path, "r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            info = parse_info_field(row.get("info", ""))
-            phase = info.get("phase")
-            if phase:
-                phases_found.add(phase)
-            # Only enforce phase filter on rows that actually contain a phase tag.
-            if phase_filter is not None and phase is not None and phase != phase_filter:
-                continue
-
-            scope = info.get("scope", "overall")
-            dataset_raw = info.get("dataset")
-            dataset_id = int(dataset_raw) if dataset_raw is not None else -1
-            key = (
-                int(row["num_levels"]),
-                int(row["vector_dimension"]),
-                scope,
-                dataset_id,
-            )
-            grouped[key].append(float(row["overall_accuracy"]))
-    return grouped, sorted(phases_found)
-
-
-def means_by_key(grouped):
-    result = {}
-    for key, values in grouped.items():
-        if values:
-            result[key] = sum(values) / len(values)
-    return result
-
-
 def compare(baseline, candidate, eps):
-    rows = []
-    keys = sorted(set(baseline.keys()) & set(candidate.keys()))
-    for key in keys:
-        b = baseline[key]
-        c = candidate[key]
-        delta = c - b
-        if delta > eps:
-            winner = "candidate"
-        elif delta < -eps:
-            winner = "krischan"
-        else:
-            winner = "tie"
-        rows.append(
-            {
-                "num_levels": key[0],
-                "vector_dimension": key[1],
-                "scope": key[2],
-                "dataset_id": key[3],
-                "krischan_accuracy": b,
-                "candidate_accuracy": c,
-                "delta_candidate_minus_krischan": delta,
-                "winner": winner,
-            }
-        )
-    return rows
+    # Inner join of the two mean Series on (levels, dimension, scope, dataset), in sorted key order.
+    rows = pd.concat({"krischan_accuracy": baseline, "candidate_accuracy": candidate}, axis=1, join="inner").sort_index()
+    rows = rows.reset_index()
+    delta = rows["candidate_accuracy"] - rows["krischan_accuracy"]
+    winner = np.select([delta > eps, delta < -eps], ["candidate", "krischan"], default="tie")
+    # The panel/scope label is derived once here instead of per row in every consumer.
+    rows = rows.assign(delta_candidate_minus_krischan=delta, winner=winner, scope_name=scope_names(rows))
+    return rows.reset_index(drop=True)
 
 
 def save_comparison_csv(path, rows):
@@ -106,16 +44,8 @@ def save_comparison_csv(path, rows):
         "delta_candidate_minus_krischan",
         "winner",
     ]
-    with open(path, "w", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fields)
-        writer.writeheader()
-        writer.writerows(rows)
-
-
-def scope_name(row):
-    if row["scope"] == "overall":
-        return "overall"
-    return f"dataset_{row['dataset_id']}"
+    # csv.writer's "\r\n" line ending is kept so the files stay byte-identical to earlier runs.
+    rows[fields].to_csv(path, index=False, lineterminator="\r\n")
 
 
 def summarize(rows):
@@ -125,89 +55,59 @@ def summarize(rows):
         print(line)
         lines.append(line)
 
-    wins_candidate = [r for r in rows if r["winner"] == "candidate"]
-    wins_krischan = [r for r in rows if r["winner"] == "krischan"]
-    ties = [r for r in rows if r["winner"] == "tie"]
+    delta = rows["delta_candidate_minus_krischan"]
+    wins = rows["winner"].value_counts().reindex(["candidate", "krischan", "tie"], fill_value=0)
 
     emit(f"Compared cases: {len(rows)}")
-    emit(f"Candidate better: {len(wins_candidate)}")
-    emit(f"Krischan better: {len(wins_krischan)}")
-    emit(f"Tie: {len(ties)}")
+    emit(f"Candidate better: {wins['candidate']}")
+    emit(f"Krischan better: {wins['krischan']}")
+    emit(f"Tie: {wins['tie']}")
 
-    mean_delta = sum(r["delta_candidate_minus_krischan"] for r in rows) / len(rows)
-    emit(f"Mean delta (candidate - krischan): {mean_delta:+.4f}")
-
-    scope_groups = defaultdict(list)
-    for row in rows:
-        scope_groups[scope_name(row)].append(row["delta_candidate_minus_krischan"])
+    emit(f"Mean delta (candidate - krischan): {delta.mean():+.4f}")
 
+    # All per-group statistics come from groupby reductions over the delta column.
+    signs = pd.DataFrame({"delta": delta, "better": delta > 0, "worse": delta < 0})
+    scope_stats = signs.groupby(rows["scope_name"]).agg(
+        mean=("delta", "mean"), better=("better", "sum"), worse=("worse", "sum"), total=("delta", "size")
+    )
     emit("\nPer-scope delta summary:")
-    for scope in sorted(scope_groups):
-        vals = scope_groups[scope]
-        local_mean = sum(vals) / len(vals)
-        pos = sum(1 for v in vals if v > 0)
-        neg = sum(1 for v in vals if v < 0)
-        emit(f"  {scope}: mean={local_mean:+.4f}, better={pos}, worse={neg}, total={len(vals)}")
-
-    by_dim = defaultdict(list)
-    by_lvl = defaultdict(list)
-    for row in rows:
-        by_dim[row["vector_dimension"]].append(row["delta_candidate_minus_krischan"])
-        by_lvl[row["num_levels"]].append(row["delta_candidate_minus_krischan"])
+    for scope, local_mean, pos, neg, total in scope_stats.itertuples():
+        emit(f"  {scope}: mean={local_mean:+.4f}, better={pos}, worse={neg}, total={total}")
+
+    by_dim = delta.groupby(rows["vector_dimension"]).mean()
+    by_lvl = delta.groupby(rows["num_levels"]).mean()
 
     emit("\nBy vector dimension (mean delta):")
-    for dim in sorted(by_dim):
-        vals = by_dim[dim]
-        emit(f"  D={dim}: {sum(vals)/len(vals):+.4f}")
+    for dim, value in by_dim.items():
+        emit(f"  D={dim}: {value:+.4f}")
 
     emit("\nBy num levels (mean delta):")
-    for lvl in sorted(by_lvl):
-        vals = by_lvl[lvl]
-        emit(f"  L={lvl}: {sum(vals)/len(vals):+.4f}")
+    for lvl, value in by_lvl.items():
+        emit(f"  L={lvl}: {value:+.4f}")
 
-    if by_dim:
-        best_dim = max(by_dim, key=lambda d: sum(by_dim[d]) / len(by_dim[d]))
-        worst_dim = min(by_dim, key=lambda d: sum(by_dim[d]) / len(by_dim[d]))
+    if not by_dim.empty:
         emit(
             "\nObserved pattern hint:"
-            f" strongest average gains at D={best_dim}, strongest average losses at D={worst_dim}."
+            f" strongest average gains at D={by_dim.idxmax()}, strongest average losses at D={by_dim.idxmin()}."
         )
 
-    if by_lvl:
-        best_lvl = max(by_lvl, key=lambda l: sum(by_lvl[l]) / len(by_lvl[l]))
-        worst_lvl = min(by_lvl, key=lambda l: sum(by_lvl[l]) / len(by_lvl[l]))
+    if not by_lvl.empty:
         emit(
             "Observed pattern hint:"
-            f" strongest average gains at L={best_lvl}, strongest average losses at L={worst_lvl}."
+            f" strongest average gains at L={by_lvl.idxmax()}, strongest average losses at L={by_lvl.idxmin()}."
         )
 
     return "\n".join(lines) + "\n"
 
 
-def build_matrix(rows, scope_key, levels, dims):
-    lookup = {}
-    for row in rows:
-        if scope_name(row) != scope_key:
-            continue
-        lookup[(row["num_levels"], row["vector_dimension"])] = row["delta_candidate_minus_krischan"]
-
-    matrix = []
-    for lvl in levels:
-        line = []
-        for dim in dims:
-            line.append(lookup.get((lvl, dim), float("nan")))
-        matrix.append(line)
-    return matrix
-
-
 def plot_heatmaps(rows, out_path):
-    levels = sorted({r["num_levels"] for r in rows})
-    dims = sorted({r["vector_dimension"] for r in rows})
-    scopes = ["overall"] + sorted({scope_name(r) for r in rows if scope_name(r) != "overall"})
+    levels = sorted(rows["num_levels"].unique().tolist())
+    dims = sorted(rows["vector_dimension"].unique().tolist())
+    scopes = ["overall"] + sorted(set(rows["scope_name"]) - {"overall"})
     if not scopes:
         raise RuntimeError("No scopes available for plotting.")
 
-    v_abs = max(abs(r["delta_candidate_minus_krischan"]) for r in rows)
+    v_abs = rows["delta_candidate_minus_krischan"].abs().max()
     if v_abs == 0:
         v_abs = 1.0
 
@@ -226,11 +126,14 @@ def plot_heatmaps(rows, out_path):
     else:
         axes = [ax for line in axes for ax in line]
 
+    matrices = build_matrices(rows, "delta_candidate_minus_krischan", scopes, levels, dims)
     image = None
     for idx, scope in enumerate(scopes):
         ax = axes[idx]
-        matrix = build_matrix(rows, scope, levels, dims)
-        image = ax.imshow(matrix, cmap="RdYlGn", vmin=-v_abs, vmax=v_abs, aspect="auto", origin="lower")
+        image = ax.imshow(
+            matrices[idx], cmap="RdYlGn", vmin=-v_abs, vmax=v_abs, aspect="auto", origin="lower",
+            interpolation="nearest", rasterized=True,
+        )
         ax.set_title(f"{scope} (delta: candidate - krischan)")
         ax.set_xlabel("Vector dimension")
         ax.set_ylabel("Num levels")
@@ -244,13 +147,11 @@ def plot_heatmaps(rows, out_path):
 
     cbar = fig.colorbar(image, ax=axes[: len(scopes)], shrink=0.9)
     cbar.set_label("Accuracy delta (green=candidate better, red=krischan better)")
-    fig.savefig(out_path, dpi=180)
+    fig.savefig(out_path, dpi=120)
     plt.close(fig)
 
 
 def main():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-
     parser = argparse.ArgumentParser(
         description=(
             "Compare one run folder against Krischan baseline. "
@@ -270,12 +171,12 @@ def main():
     if not os.path.isfile(candidate_csv):
         raise RuntimeError(f"Expected candidate CSV not found: {candidate_csv}")
 
-    baseline_grouped, _ = load_grouped_results(KRISCHAN_BASELINE, phase_filter=None)
-    candidate_all, candidate_phases = load_grouped_results(candidate_csv, phase_filter=None)
+    baseline_records, _ = read_results(KRISCHAN_BASELINE)
+    candidate_records, candidate_phases = read_results(candidate_csv)
 
-    if not baseline_grouped:
+    if baseline_records.empty:
         raise RuntimeError("No baseline rows loaded after filtering.")
-    if not candidate_all:
+    if candidate_records.empty:
         raise RuntimeError("No candidate rows loaded after filtering.")
 
     candidate_phase = None
@@ -293,12 +194,10 @@ def main():
 
     if candidate_phase is not None:
         print(f"Using candidate phase='{candidate_phase}' for comparison.")
-    candidate_grouped, _ = load_grouped_results(candidate_csv, phase_filter=candidate_phase)
-
-    baseline_means = means_by_key(baseline_grouped)
-    candidate_means = means_by_key(candidate_grouped)
+    baseline_means = mean_results(baseline_records)
+    candidate_means = mean_results(candidate_records, phase_filter=candidate_phase)
     rows = compare(baseline_means, candidate_means, eps=1e-9)
-    if not rows:
+    if rows.empty:
         raise RuntimeError("No overlapping config/scope cases between baseline and candidate.")
 
     out_csv = os.path.join(run_dir, "comparison_against_krischan.csv")
@@ -1,103 +1,35 @@
 #!/usr/bin/env python3
 import argparse
-import csv
 import math
 import os
-from collections import defaultdict
 
 try:
     import matplotlib.pyplot as plt
+    import numpy as np
+    import pandas as pd
 except ModuleNotFoundError as exc:
     raise SystemExit(
-        "Missing dependency: matplotlib. Install with 'python -m pip install matplotlib'."
+        f"Missing dependency: {exc.name}. Install with 'python -m pip install {exc.name}'."
     ) from exc
 
-
-def parse_info_field(info_value):
-    parsed = {}
-    if not info_value:
-        return parsed
-    for token in info_value.split(","):
-        token = token.strip()
-        if not token or "=" not in token:
-            continue
-        key, value = token.split("=", 1)
-        parsed[key.strip()] = value.strip()
-    return parsed
-
-
-def load_grouped_results(csv_path, phase_filter=None):
-    grouped = defaultdict(list)
-    phases_found = set()
-    with open(csv_path, "r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            info = parse_info_field(row.get("info", ""))
-            phase = info.get("phase")
-            if phase:
-                phases_found.add(phase)
-            if phase_filter is not None and phase is not None and phase != phase_filter:
-                continue
-
-            scope = info.get("scope", "overall")
-            dataset_raw = info.get("dataset")
-            dataset_id = int(dataset_raw) if dataset_raw is not None else -1
-            key = (
-                int(row["num_levels"]),
-                int(row["vector_dimension"]),
-                scope,
-                dataset_id,
-            )
-            grouped[key].append(float(row["overall_accuracy"]))
-    return grouped, sorted(phases_found)
-
-
-def means_by_key(grouped):
-    result = {}
-    for key, values in grouped.items():
-        if values:
-            result[key] = sum(values) / len(values)
-    return result
-
-
-def scope_name(row):
-    if row["scope"] == "overall":
-        return "overall"
-    return f"dataset_{row['dataset_id']}"
+# The result reader and aggregation helpers are shared by both comparison scripts.
+from _results_utils import build_matrices, mean_results, read_results, scope_names
 
 
 def include_case(scope, dataset_id):
-    return not (scope == "dataset" and dataset_id == 1)
+    return ~((scope == "dataset") & (dataset_id == 1))
 
 
 def compare(run_a, run_b, eps):
-    rows = []
-    keys = sorted(set(run_a.keys()) & set(run_b.keys()))
-    for key in keys:
-        if not include_case(key[2], key[3]):
-            continue
-        a = run_a[key]
-        b = run_b[key]
-        delta = b - a
-        if delta > eps:
-            winner = "run_b"
-        elif delta < -eps:
-            winner = "run_a"
-        else:
-            winner = "tie"
-        rows.append(
-            {
-                "num_levels": key[0],
-                "vector_dimension": key[1],
-                "scope": key[2],
-                "dataset_id": key[3],
-                "run_a_accuracy": a,
-                "run_b_accuracy": b,
-                "delta_run_b_minus_run_a": delta,
-                "winner": winner,
-            }
-        )
-    return rows
+    # Inner join of the two mean Series on (levels, dimension, scope, dataset), in sorted key order.
+    rows = pd.concat({"run_a_accuracy": run_a, "run_b_accuracy": run_b}, axis=1, join="inner").sort_index()
+    rows = rows.reset_index()
+    rows = rows[include_case(rows["scope"], rows["dataset_id"])]
+    delta = rows["run_b_accuracy"] - rows["run_a_accuracy"]
+    winner = np.select([delta > eps, delta < -eps], ["run_b", "run_a"], default="tie")
+    # The panel/scope label is derived once here instead of per row in every consumer.
+    rows = rows.assign(delta_run_b_minus_run_a=delta, winner=winner, scope_name=scope_names(rows))
+    return rows.reset_index(drop=True)
 
 
 def summarize(rows, label_a, label_b):
@@ -107,59 +39,45 @@ def summarize(rows, label_a, label_b):
         print(line)
         lines.append(line)
 
-    wins_a = [r for r in rows if r["winner"] == "run_a"]
-    wins_b = [r for r in rows if r["winner"] == "run_b"]
-    ties = [r for r in rows if r["winner"] == "tie"]
+    delta = rows["delta_run_b_minus_run_a"]
+    wins = rows["winner"].value_counts().reindex(["run_b", "run_a", "tie"], fill_value=0)
 
     emit(f"Compared cases: {len(rows)}")
-    emit(f"{label_b} better: {len(wins_b)}")
-    emit(f"{label_a} better: {len(wins_a)}")
-    emit(f"Tie: {len(ties)}")
-
-    mean_delta = sum(r["delta_run_b_minus_run_a"] for r in rows) / len(rows)
-    emit(f"Mean delta ({label_b} - {label_a}): {mean_delta:+.4f}")
+    emit(f"{label_b} better: {wins['run_b']}")
+    emit(f"{label_a} better: {wins['run_a']}")
+    emit(f"Tie: {wins['tie']}")
 
-    scope_groups = defaultdict(list)
-    for row in rows:
-        scope_groups[scope_name(row)].append(row["delta_run_b_minus_run_a"])
+    emit(f"Mean delta ({label_b} - {label_a}): {delta.mean():+.4f}")
 
+    # All per-group statistics come from groupby reductions over the delta column.
+    signs = pd.DataFrame({"delta": delta, "better": delta > 0, "worse": delta < 0})
+    scope_stats = signs.groupby(rows["scope_name"]).agg(
+        mean=("delta", "mean"), better=("better", "sum"), worse=("worse", "sum"), total=("delta", "size")
+    )
     emit("\nPer-scope delta summary:")
-    for scope in sorted(scope_groups):
-        vals = scope_groups[scope]
-        local_mean = sum(vals) / len(vals)
-        pos = sum(1 for v in vals if v > 0)
-        neg = sum(1 for v in vals if v < 0)
-        emit(f"  {scope}: mean={local_mean:+.4f}, better={pos}, worse={neg}, total={len(vals)}")
-
-    by_dim = defaultdict(list)
-    by_lvl = defaultdict(list)
-    for row in rows:
-        by_dim[row["vector_dimension"]].append(row["delta_run_b_minus_run_a"])
-        by_lvl[row["num_levels"]].append(row["delta_run_b_minus_run_a"])
+    for scope, local_mean, pos, neg, total in scope_stats.itertuples():
+        emit(f"  {scope}: mean={local_mean:+.4f}, better={pos}, worse={neg}, total={total}")
+
+    by_dim = delta.groupby(rows["vector_dimension"]).mean()
+    by_lvl = delta.groupby(rows["num_levels"]).mean()
 
     emit("\nBy vector dimension (mean delta):")
-    for dim in sorted(by_dim):
-        vals = by_dim[dim]
-        emit(f"  D={dim}: {sum(vals)/len(vals):+.4f}")
+    for dim, value in by_dim.items():
+        emit(f"  D={dim}: {value:+.4f}")
 
     emit("\nBy num levels (mean delta):")
-    for lvl in sorted(by_lvl):
-        vals = by_lvl[lvl]
-        emit(f"  L={lvl}: {sum(vals)/len(vals):+.4f}")
+    for lvl, value in by_lvl.items():
+        emit(f"  L={lvl}: {value:+.4f}")
 
-    if by_dim:
-        best_dim = max(by_dim, key=lambda d: sum(by_dim[d]) / len(by_dim[d]))
-        worst_dim = min(by_dim, key=lambda d: sum(by_dim[d]) / len(by_dim[d]))
+    if not by_dim.empty:
         emit(
             "\nObserved pattern hint:"
-            f" strongest average gains at D={best_dim}, strongest average losses at D={worst_dim}."
+            f" strongest average gains at D={by_dim.idxmax()}, strongest average losses at D={by_dim.idxmin()}."
         )
-    if by_lvl:
-        best_lvl = max(by_lvl, key=lambda l: sum(by_lvl[l]) / len(by_lvl[l]))
-        worst_lvl = min(by_lvl, key=lambda l: sum(by_lvl[l]) / len(by_lvl[l]))
+    if not by_lvl.empty:
         emit(
             "Observed pattern hint:"
-            f" strongest average gains at L={best_lvl}, strongest average losses at L={worst_lvl}."
+            f" strongest average gains at L={by_lvl.idxmax()}, strongest average losses at L={by_lvl.idxmin()}."
         )
 
     return "\n".join(lines) + "\n"
@@ -176,36 +94,18 @@ def save_comparison_csv(path, rows):
         "delta_run_b_minus_run_a",
         "winner",
     ]
-    with open(path, "w", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fields)
-        writer.writeheader()
-        writer.writerows(rows)
-
-
-def build_matrix(rows, scope_key, levels, dims):
-    lookup = {}
-    for row in rows:
-        if scope_name(row) != scope_key:
-            continue
-        lookup[(row["num_levels"], row["vector_dimension"])] = row["delta_run_b_minus_run_a"]
-
-    matrix = []
-    for lvl in levels:
-        line = []
-        for dim in dims:
-            line.append(lookup.get((lvl, dim), float("nan")))
-        matrix.append(line)
-    return matrix
+    # csv.writer's "\r\n" line ending is kept so the files stay byte-identical to earlier runs.
+    rows[fields].to_csv(path, index=False, lineterminator="\r\n")
 
 
 def plot_heatmaps(rows, out_path, label_a, label_b):
-    levels = sorted({r["num_levels"] for r in rows})
-    dims = sorted({r["vector_dimension"] for r in rows})
-    scopes = ["overall"] + sorted({scope_name(r) for r in rows if scope_name(r) != "overall"})
+    levels = sorted(rows["num_levels"].unique().tolist())
+    dims = sorted(rows["vector_dimension"].unique().tolist())
+    scopes = ["overall"] + sorted(set(rows["scope_name"]) - {"overall"})
     if not scopes:
         raise RuntimeError("No scopes available for plotting.")
 
-    v_abs = max(abs(r["delta_run_b_minus_run_a"]) for r in rows)
+    v_abs = rows["delta_run_b_minus_run_a"].abs().max()
     if v_abs == 0:
         v_abs = 1.0
 
@@ -224,11 +124,14 @@ def plot_heatmaps(rows, out_path, label_a, label_b):
     else:
         axes = [ax for line in axes for ax in line]
 
+    matrices = build_matrices(rows, "delta_run_b_minus_run_a", scopes, levels, dims)
     image = None
     for idx, scope in enumerate(scopes):
         ax = axes[idx]
-        matrix = build_matrix(rows, scope, levels, dims)
-        image = ax.imshow(matrix, cmap="RdYlGn", vmin=-v_abs, vmax=v_abs, aspect="auto", origin="lower")
+        image = ax.imshow(
+            matrices[idx], cmap="RdYlGn", vmin=-v_abs, vmax=v_abs, aspect="auto", origin="lower",
+            interpolation="nearest", rasterized=True,
+        )
         ax.set_title(f"{scope} (delta: {label_b} - {label_a})")
         ax.set_xlabel("Vector dimension")
         ax.set_ylabel("Num levels")
@@ -242,7 +145,7 @@ def plot_heatmaps(rows, out_path, label_a, label_b):
 
     cbar = fig.colorbar(image, ax=axes[: len(scopes)], shrink=0.9)
     cbar.set_label(f"Accuracy delta (green={label_b} better, red={label_a} better)")
-    fig.savefig(out_path, dpi=180)
+    fig.savefig(out_path, dpi=120)
     plt.close(fig)
 
 
@@ -298,23 +201,21 @@ def main():
     if not os.path.isfile(run_b_csv):
         raise RuntimeError(f"Expected CSV missing in run B directory: {run_b_csv}")
 
-    grouped_a_all, phases_a = load_grouped_results(run_a_csv, phase_filter=None)
-    grouped_b_all, phases_b = load_grouped_results(run_b_csv, phase_filter=None)
-    if not grouped_a_all:
+    records_a, phases_a = read_results(run_a_csv)
+    records_b, phases_b = read_results(run_b_csv)
+    if records_a.empty:
         raise RuntimeError("No rows loaded from run A CSV.")
-    if not grouped_b_all:
+    if records_b.empty:
         raise RuntimeError("No rows loaded from run B CSV.")
 
     phase = choose_phase(phases_a, phases_b, args.phase)
     if phase is not None:
         print(f"Using phase='{phase}' for both runs.")
-    grouped_a, _ = load_grouped_results(run_a_csv, phase_filter=phase)
-    grouped_b, _ = load_grouped_results(run_b_csv, phase_filter=phase)
 
-    means_a = means_by_key(grouped_a)
-    means_b = means_by_key(grouped_b)
+    means_a = mean_results(records_a, phase_filter=phase)
+    means_b = mean_results(records_b, phase_filter=phase)
     rows = compare(means_a, means_b, eps=1e-9)
-    if not rows:
+    if rows.empty:
         raise RuntimeError("No overlapping config/scope cases between run A and run B after filtering.")
 
     label_a = args.label_a if args.label_a else os.path.basename(os.path.normpath(run_a_dir))
@@ -5,7 +5,13 @@ import shlex
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _runner_utils import make_jobs  # noqa: E402
 #
 # IMPORTANT!!!!!!
 #
@@ -18,6 +24,9 @@ NUM_LEVELS = 51
 NUM_FEATURES = 32
 N_GRAM_SIZE = 5
 KRISCHAN_MODE = 1
+# Parallel compile jobs for the Marian build; the Makefile runs clean before compiling, so -j is safe.
+# Set MAKE_JOBS in the environment to override.
+MAKE_JOBS = make_jobs(os.cpu_count() or 1)
 
 
 def write_comment(log_file, text):
@@ -86,30 +95,54 @@ def run_binary(log_file, title, binary_path, args, cwd):
 
 
 def convert_bitstrings_to_item_mem_csv(input_path, output_path, expected_vectors, expected_dimension):
-    lines = []
     with open(input_path, "r", encoding="ascii") as handle:
-        for line in handle:
-            line = line.strip()
-            if line:
-                lines.append(line)
+        lines = [line.strip() for line in handle if line.strip()]
 
     if len(lines) < expected_vectors:
         raise RuntimeError(
             f"{input_path} contains {len(lines)} vectors, expected at least {expected_vectors}."
         )
 
+    rows = lines[:expected_vectors]
+    for idx, bits in enumerate(rows):
+        if len(bits) != expected_dimension:
+            raise RuntimeError(
+                f"{input_path} row {idx} has length {len(bits)}, expected {expected_dimension}."
+            )
+
+    # Validate and interleave the separators on the raw ASCII bytes of all rows at once.
+    bits = np.frombuffer("".join(rows).encode("ascii"), dtype=np.uint8)
+    bits = bits.reshape(expected_vectors, expected_dimension)
+    non_binary = ~((bits == ord("0")) | (bits == ord("1"))).all(axis=1)
+    if non_binary.any():
+        idx = int(np.argmax(non_binary))
+        raise RuntimeError(f"{input_path} row {idx} contains non-binary characters.")
+
+    out = np.empty((expected_vectors, 2 * expected_dimension), dtype=np.uint8)
+    out[:, 0::2] = bits
+    out[:, 1::2] = ord(",")
+    out[:, -1] = ord("\n")
+
+    header = f"#item_mem,num_vectors={expected_vectors},dimension={expected_dimension}\n"
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", encoding="ascii", newline="\n") as handle:
-        handle.write(f"#item_mem,num_vectors={expected_vectors},dimension={expected_dimension}\n")
-        for idx in range(expected_vectors):
-            bits = lines[idx]
-            if len(bits) != expected_dimension:
-                raise RuntimeError(
-                    f"{input_path} row {idx} has length {len(bits)}, expected {expected_dimension}."
-                )
-            if set(bits) - {"0", "1"}:
-                raise RuntimeError(f"{input_path} row {idx} contains non-binary characters.")
-            handle.write(",".join(bits) + "\n")
+    # Renamed into place so an existing hard link to output_path keeps its old data.
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(header.encode("ascii"))
+        handle.write(out.tobytes())
+    os.replace(tmp_path, output_path)
+
+
+def sync_file(src, dst):
+    # A hard link makes dst share src's data without copying it; filesystems
+    # without hard links (or src and dst on different devices) fall back to a copy.
+    # Both item memory writers replace their output via rename, never in place,
+    # so rewriting one side does not change the other.
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
 
 
 def find_binary(candidates):
@@ -119,6 +152,30 @@ def find_binary(candidates):
     raise FileNotFoundError(f"No binary found. Tried: {[str(path) for path in candidates]}")
 
 
+def run_marian_pipeline(log_path, repo_root, make_args):
+    with open(log_path, "w", encoding="utf-8", newline="\n") as log_file:
+        make_cmd, make_cwd = get_make_command(repo_root, make_args)
+        run_command(log_file, "Step 4/7: Build Marian model", make_cmd, make_cwd)
+
+        binary = find_binary([repo_root / "modelFoot", repo_root / "modelFoot.exe"])
+        run_binary(log_file, "Step 5/7: Run Marian model", binary, [], repo_root)
+
+
+def run_krischan_pipeline(log_path, krischan_root):
+    with open(log_path, "w", encoding="utf-8", newline="\n") as log_file:
+        make_cmd, make_cwd = get_make_command(krischan_root, ["build"])
+        run_command(log_file, "Step 6/7: Build Krischan model", make_cmd, make_cwd)
+
+        binary = find_binary([krischan_root / "hdc_model", krischan_root / "hdc_model.exe"])
+        run_binary(
+            log_file,
+            "Step 7/7: Run Krischan model (mode=1)",
+            binary,
+            [VECTOR_DIMENSION, NUM_LEVELS, KRISCHAN_MODE],
+            krischan_root,
+        )
+
+
 def main():
     script_dir = Path(__file__).resolve().parent
     repo_root = script_dir.parent.parent
@@ -136,6 +193,10 @@ def main():
     imported_im_csv = big_test_dir / "krischan_position_vectors.csv"
     imported_cm_csv = big_test_dir / "krischan_value_vectors.csv"
 
+    pipeline_logs_dir = repo_root / "build" / "validate_consistency"
+    marian_log = pipeline_logs_dir / "marian_output.txt"
+    krischan_log = pipeline_logs_dir / "krischan_output.txt"
+
     memoryfiles_dir = krischan_root / "memoryfiles"
     position_vectors_txt = memoryfiles_dir / "position-vectors.txt"
     value_vectors_txt = memoryfiles_dir / "value_vectors.txt"
@@ -179,16 +240,18 @@ def main():
             expected_dimension=VECTOR_DIMENSION,
         )
         imported_im_csv.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copyfile(local_im_csv, imported_im_csv)
-        shutil.copyfile(local_cm_csv, imported_cm_csv)
+        sync_file(local_im_csv, imported_im_csv)
+        sync_file(local_cm_csv, imported_cm_csv)
         log_file.write(f"# Wrote local IM CSV: {local_im_csv}\n")
         log_file.write(f"# Wrote local CM CSV: {local_cm_csv}\n")
         log_file.write(f"# Synced imported IM CSV: {imported_im_csv}\n")
         log_file.write(f"# Synced imported CM CSV: {imported_cm_csv}\n")
         log_file.flush()
 
-        # Step 3: Build and run Marian model.
+        # Steps 4-7: the Marian and Krischan pipelines only share the CSVs written above,
+        # so they run side by side, each logging to its own file under build/.
         marian_make_args = [
+            f"-j{MAKE_JOBS}",
             "foot",
             "USE_OPENMP=1",
             "PRECOMPUTED_ITEM_MEMORY=0",
@@ -200,26 +263,23 @@ def main():
             f"NUM_LEVELS={NUM_LEVELS}",
             f"RESULT_CSV_PATH={marian_results_rel}",
         ]
-        marian_make_cmd, marian_make_cwd = get_make_command(repo_root, marian_make_args)
-        run_command(log_file, "Step 4/7: Build Marian model", marian_make_cmd, marian_make_cwd)
-
-        marian_binary = find_binary([repo_root / "modelFoot", repo_root / "modelFoot.exe"])
-        run_binary(log_file, "Step 5/7: Run Marian model", marian_binary, [], repo_root)
-
-        # Step 4: Build and run Krischan model.
-        krischan_make_cmd, krischan_make_cwd = get_make_command(krischan_root, ["build"])
-        run_command(log_file, "Step 6/7: Build Krischan model", krischan_make_cmd, krischan_make_cwd)
-
-        krischan_binary = find_binary(
-            [krischan_root / "hdc_model", krischan_root / "hdc_model.exe"]
-        )
-        run_binary(
-            log_file,
-            "Step 7/7: Run Krischan model (mode=1)",
-            krischan_binary,
-            [VECTOR_DIMENSION, NUM_LEVELS, KRISCHAN_MODE],
-            krischan_root,
-        )
+        pipeline_logs_dir.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(run_marian_pipeline, marian_log, repo_root, marian_make_args),
+                pool.submit(run_krischan_pipeline, krischan_log, krischan_root),
+            ]
+            errors = [future.exception() for future in futures]
+
+        # Both logs are appended in step order, so the consolidated file reads as before.
+        for pipeline_log in (marian_log, krischan_log):
+            if pipeline_log.exists():
+                with open(pipeline_log, "r", encoding="utf-8") as src:
+                    shutil.copyfileobj(src, log_file)
+        log_file.flush()
+        for error in errors:
+            if error is not None:
+                raise error
 
         write_comment(log_file, "Consistency validation run finished")
         log_file.write(
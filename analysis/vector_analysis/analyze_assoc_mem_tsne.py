@@ -1,8 +1,10 @@
 import os
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 
 try:
+    from sklearn.decomposition import PCA
     from sklearn.manifold import TSNE
 except ImportError as exc:
     raise SystemExit(
@@ -12,12 +14,17 @@ except ImportError as exc:
 PRE_FILE = "assocMemPreopt.csv"
 POST_FILE = "assocMemPostopt.csv"
 RANDOM_STATE = 0
+# Below this many points (pre + post class vectors) a t-SNE layout is mostly noise,
+# so the deterministic PCA projection is plotted instead.
+PCA_MAX_SAMPLES = 50
 
 
 def load_assoc_vectors(path):
     if not os.path.exists(path):
         raise FileNotFoundError(f"Missing file: {path}")
-    X = np.loadtxt(path, delimiter=",", comments="#")
+    # pandas' C tokenizer fills one float32 buffer instead of np.loadtxt's per-value Python parsing;
+    # the "#" header line is skipped as a comment.
+    X = pd.read_csv(path, sep=",", comment="#", header=None, dtype=np.float32, engine="c").to_numpy()
     if X.ndim == 1:
         X = X.reshape(1, -1)
     return X
@@ -40,10 +47,26 @@ def main():
 
     combined = np.vstack([pre, post])
     n_samples = combined.shape[0]
-    perplexity = min(5, n_samples - 1)
 
-    tsne = TSNE(n_components=2, perplexity=perplexity, random_state=RANDOM_STATE)
-    emb = tsne.fit_transform(combined)
+    if n_samples < PCA_MAX_SAMPLES:
+        method = "PCA"
+        pca = PCA(n_components=2, svd_solver="randomized", random_state=RANDOM_STATE)
+        emb = pca.fit_transform(combined)
+    else:
+        method = "t-SNE"
+        perplexity = min(5, n_samples - 1)
+        # Barnes-Hut and PCA init are pinned so older scikit-learn releases (random init) give the same run;
+        # combined is already float32 from the loader, which is what TSNE works in internally.
+        tsne = TSNE(
+            n_components=2,
+            perplexity=perplexity,
+            method="barnes_hut",
+            angle=0.5,
+            init="pca",
+            random_state=RANDOM_STATE,
+            n_jobs=-1,
+        )
+        emb = tsne.fit_transform(combined)
 
     pre_emb = emb[:num_classes]
     post_emb = emb[num_classes:]
@@ -59,8 +82,8 @@ def main():
         axes[1].scatter(post_emb[cls, 0], post_emb[cls, 1], color=colors[cls], label=f"Class {cls}")
 
     for ax in axes:
-        ax.set_xlabel("t-SNE 1")
-        ax.set_ylabel("t-SNE 2")
+        ax.set_xlabel(f"{method} 1")
+        ax.set_ylabel(f"{method} 2")
         ax.grid(True)
 
     # Single legend
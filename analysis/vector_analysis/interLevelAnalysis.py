@@ -1,6 +1,12 @@
+import argparse
 import os
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
+import pandas as pd
+
+# Plot output helpers are shared by all analysis scripts.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from _plot_utils import add_output_args, import_pyplot, save_figure  # noqa: E402
 
 # =============================
 # USER-CONFIGURABLE CONSTANTS
@@ -13,6 +19,15 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CIM_NAIVE_FILE = os.path.join(BASE_DIR, "./item_mem_naive.csv")
 CIM_OPT_FILE   = os.path.join(BASE_DIR, "./item_mem_optimized.csv")
 
+# Bytes read when looking for the "#..." header line of an item-memory CSV.
+HEADER_READ_BYTES = 4096
+
+# Parsed item memories are cached next to the CSV as <file>.csv.fld.npy, already in
+# (features, levels, dim) order.
+CACHE_SUFFIX = ".fld.npy"
+# Entries drawn by is_binary_vectors before it falls back to a full scan.
+BINARY_SAMPLE_SIZE = 4096
+
 # Set to True/False to override auto-detection. Leave as None for auto.
 FORCE_BINARY_MODE = None
 
@@ -29,8 +44,11 @@ ALL_FEATURE_LINEWIDTH = 0.8        # used when COMPARE_MODE="all"
 # =============================
 def parse_csv_header(path):
     header = {}
-    with open(path, "r", encoding="utf-8") as f:
-        first = f.readline()
+    # The header is one short line; a single bounded read avoids line-buffering
+    # through a long first data row when the file has no header.
+    with open(path, "rb") as f:
+        chunk = f.read(HEADER_READ_BYTES)
+    first = chunk.split(b"\n", 1)[0].decode("utf-8", errors="replace")
     if not first.startswith("#"):
         return header
     parts = first[1:].strip().split(",")
@@ -52,16 +70,30 @@ def load_precomp_item_mem(path,
     if not os.path.exists(path):
         raise FileNotFoundError(f"Missing file: {path}")
 
-    header = parse_csv_header(path)
+    if path.endswith(".npy"):
+        # Binary dumps are memory-mapped instead of parsed. A 3-D array is already
+        # (levels, features, dim); a 2-D one holds the CSV rows and is shaped like them below.
+        X = np.asarray(np.load(path, mmap_mode="r"), dtype=np.float32)
+        if X.ndim == 3:
+            return feature_major(X)
+        header = {"dimension": X.shape[-1]}
+        cache_path = None
+    else:
+        # The reshaped array is cached next to the CSV and memory-mapped until the CSV changes.
+        cache_path = path + CACHE_SUFFIX
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            return np.load(cache_path, mmap_mode="r")
+
+        header = parse_csv_header(path)
+        # pandas' C parser is much faster than np.loadtxt on large item-memory dumps;
+        # the "#" header line is skipped as a comment. Entries are small integers, so float32 is exact.
+        X = pd.read_csv(path, sep=",", comment="#", header=None, dtype=np.float32, engine="c").to_numpy()
+
     num_levels = header.get("num_levels", default_levels)
     num_features = header.get("num_features", default_features)
     num_vectors = header.get("num_vectors", None)
     dim = header.get("dimension", default_dim)
 
-    X = np.loadtxt(path, delimiter=",", comments="#")
-    if X.ndim == 1:
-        X = X.reshape(1, -1)
-
     if dim is None or dim <= 0:
         dim = X.shape[1]
 
@@ -87,42 +119,100 @@ def load_precomp_item_mem(path,
         print(f"Warning: dimension mismatch in {path}: header {dim}, file {X.shape[1]}")
         dim = X.shape[1]
 
-    V = X.reshape((num_levels, num_features, dim))
+    # Rows are stored level-major; the batched metrics want each feature's (levels, dim)
+    # block contiguous, so the memory is transposed once here rather than per analysis.
+    V = feature_major(X.reshape((num_levels, num_features, dim)))
+    if cache_path is not None:
+        try:
+            np.save(cache_path, V)
+        except OSError as exc:
+            print(f"Could not write cache {cache_path}: {exc}")
     return V
 
 
+# The metric helpers take (levels, dim) or a batch (features, levels, dim);
+# a batch is handled by one matmul/einsum instead of a Python loop over features.
+
+def unit_rows(V):
+    return V / (np.linalg.norm(V, axis=-1, keepdims=True) + 1e-12)
+
+def _cosine_similarity_from_unit(Vn):
+    return Vn @ np.swapaxes(Vn, -1, -2)
+
+def _consecutive_cosine_from_unit(Vn):
+    return 1.0 - np.einsum("...ld,...ld->...l", Vn[..., :-1, :], Vn[..., 1:, :])
+
 def cosine_similarity_matrix(V):
-    norms = np.linalg.norm(V, axis=1, keepdims=True) + 1e-12
-    Vn = V / norms
-    return Vn @ Vn.T
+    return _cosine_similarity_from_unit(unit_rows(V))
 
 def hamming_similarity_matrix(V):
-    diff = V[:, None, :] != V[None, :, :]
-    dist = diff.mean(axis=2)
-    return 1.0 - dist
+    # Mapped to +/-1, a single GEMM gives agreements - disagreements per pair, so the
+    # (levels, levels, dim) comparison tensor is never built. Counts are exact in float32.
+    dim = V.shape[-1]
+    S = 2.0 * np.asarray(V, dtype=np.float32) - 1.0
+    H = S @ np.swapaxes(S, -1, -2)
+    return (dim + H.astype(np.float64)) / (2.0 * dim)
 
 
 def consecutive_cosine_distances(V):
-    norms = np.linalg.norm(V, axis=1) + 1e-12
-    dots = np.sum(V[:-1] * V[1:], axis=1)
-    cos = dots / (norms[:-1] * norms[1:])
-    return 1.0 - cos
+    return _consecutive_cosine_from_unit(unit_rows(V))
 
 def consecutive_hamming_distances(V):
-    return (V[:-1] != V[1:]).mean(axis=1)
+    # XOR + popcount on bit-packed rows instead of comparing one float per bit.
+    P = pack_bits(V)
+    return popcount(P[..., :-1, :] ^ P[..., 1:, :]).sum(axis=-1) / V.shape[-1]
 
 
-def classical_mds_from_distance(D, out_dim=2):
-    n = D.shape[0]
-    D2 = D ** 2
+# Popcount of every byte value, for NumPy versions without np.bitwise_count.
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def pack_bits(V):
+    # 0/1 vectors packed along the last axis: uint64 words when NumPy has a native
+    # popcount, plain bytes for the lookup-table fallback. Padding bits are zero.
+    packed = np.packbits(V != 0, axis=-1)
+    if not hasattr(np, "bitwise_count"):
+        return packed
+    pad = -packed.shape[-1] % 8
+    if pad:
+        packed = np.concatenate([packed, np.zeros(packed.shape[:-1] + (pad,), dtype=np.uint8)], axis=-1)
+    return packed.view(np.uint64)
+
+def popcount(P):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(P)
+    return POPCOUNT_TABLE[P]
+
 
-    J = np.eye(n) - np.ones((n, n)) / n
-    B = -0.5 * J @ D2 @ J
+def feature_major(V):
+    # (levels, features, dim) -> contiguous (features, levels, dim) batch.
+    return np.ascontiguousarray(np.transpose(V, (1, 0, 2)))
 
-    eigvals, eigvecs = np.linalg.eigh(B)
-    idx = np.argsort(eigvals)[::-1]
-    eigvals = eigvals[idx]
-    eigvecs = eigvecs[:, idx]
+
+def classical_mds_from_distance(D, out_dim=2):
+    return classical_mds_from_squared(np.square(D), out_dim)
+
+def classical_mds_from_similarity(S, out_dim=2):
+    # D = 1 - S is formed and squared in one buffer, so only S and B are ever resident.
+    B = np.subtract(1.0, S)
+    np.square(B, out=B)
+    return classical_mds_from_squared(B, out_dim)
+
+def classical_mds_from_squared(B, out_dim=2):
+    # Double centering (-0.5 * J D2 J) from row/column means, without forming J or two n x n matmuls.
+    # B holds the squared distances and is centered in place.
+    row_mean = B.mean(axis=0, keepdims=True)
+    col_mean = B.mean(axis=1, keepdims=True)
+    grand_mean = B.mean()
+    B -= row_mean
+    B -= col_mean
+    B += grand_mean
+    B *= -0.5
+
+    # eigh returns eigenvalues in ascending order, so the largest ones are simply the last ones.
+    # The L x L solve is tiny, so it always runs in float64 even when D comes from float32 vectors.
+    eigvals, eigvecs = np.linalg.eigh(B.astype(np.float64, copy=False))
+    eigvals = eigvals[::-1]
+    eigvecs = eigvecs[:, ::-1]
 
     eigvals = np.clip(eigvals[:out_dim], a_min=0.0, a_max=None)
     Y = eigvecs[:, :out_dim] * np.sqrt(eigvals + 1e-12)
@@ -130,15 +220,23 @@ def classical_mds_from_distance(D, out_dim=2):
 
 
 def cosine_distance(u, v):
-    num = np.dot(u, v)
-    den = (np.linalg.norm(u) * np.linalg.norm(v)) + 1e-12
+    num = np.einsum("...d,...d->...", u, v)
+    den = (np.linalg.norm(u, axis=-1) * np.linalg.norm(v, axis=-1)) + 1e-12
     return 1.0 - (num / den)
 
 def hamming_distance(u, v):
-    return np.mean(u != v)
+    return np.mean(u != v, axis=-1)
 
 def is_binary_vectors(V):
-    return np.all((V == 0) | (V == 1))
+    # Real-valued memories are rejected from a small random sample; only a memory that
+    # looks binary pays for the exact full scan.
+    flat = np.ravel(V)
+    if flat.size == 0:
+        return True
+    sample = flat[np.random.default_rng(0).integers(0, flat.size, min(flat.size, BINARY_SAMPLE_SIZE))]
+    if not np.all((sample == 0) | (sample == 1)):
+        return False
+    return bool(np.all((flat == 0) | (flat == 1)))
 
 def similarity_matrix(V, binary_mode):
     if binary_mode:
@@ -159,82 +257,98 @@ def pair_distance(u, v, binary_mode):
 # ANALYSIS
 # =============================
 
-def analyze_precomp_cim(name, V, binary_mode):
-    num_levels, num_features, _ = V.shape
+def analyze_precomp_cim(name, V, binary_mode, out_dir, interactive, full=True):
+    # With full=False only the adjacent distances are computed; the L x L similarity,
+    # MDS and the per-variant figure are skipped.
+    if binary_mode:
+        d_adj_all = consecutive_hamming_distances(V)
+        S_all = hamming_similarity_matrix(V) if full else None
+    else:
+        # Rows are normalized once and shared by both cosine metrics.
+        Vn = unit_rows(V)
+        d_adj_all = _consecutive_cosine_from_unit(Vn)
+        S_all = _cosine_similarity_from_unit(Vn) if full else None
+    d_adj_mean = d_adj_all.mean(axis=0)
+    d_adj_std = d_adj_all.std(axis=0)
+    if not full:
+        return d_adj_all, d_adj_mean, d_adj_std
+
+    S = S_all.mean(axis=0, dtype=np.float64)
+    Y = classical_mds_from_similarity(S, out_dim=2)
 
-    d_adj_all = np.zeros((num_features, num_levels - 1))
-    sim_sum = np.zeros((num_levels, num_levels))
+    if out_dir is not None:
+        plot_precomp_cim(name, d_adj_mean, d_adj_std, S, Y, binary_mode, out_dir, interactive)
 
-    for f in range(num_features):
-        Vf = V[:, f, :]
-        d_adj_all[f] = consecutive_distances(Vf, binary_mode)
-        sim_sum += similarity_matrix(Vf, binary_mode)
+    return d_adj_all, d_adj_mean, d_adj_std
 
-    d_adj_mean = d_adj_all.mean(axis=0)
-    d_adj_std = d_adj_all.std(axis=0)
 
-    S = sim_sum / num_features
-    D = 1.0 - S
-    Y = classical_mds_from_distance(D, out_dim=2)
+def plot_precomp_cim(name, d_adj_mean, d_adj_std, S, Y, binary_mode, out_dir, interactive):
+    import matplotlib.pyplot as plt
+
+    num_levels = S.shape[0]
 
+    # The figure is labelled so it can be saved under a descriptive file name.
+    slug = name.lower().replace(" ", "_")
     distance_label = "Hamming distance" if binary_mode else "1 - cosine similarity"
     sim_label = "Hamming similarity" if binary_mode else "cosine similarity"
     title_metric = "Hamming" if binary_mode else "cosine"
 
+    # All three views of one item memory share a single figure, saved as <slug>_analysis.png.
+    fig, (ax_adj, ax_sim, ax_mds) = plt.subplots(
+        1, 3, figsize=(16, 4.5), constrained_layout=True, num=f"{slug}_analysis"
+    )
+    fig.suptitle(name)
+
     # Plot 1: adjacent distances (mean+/-std)
-    plt.figure()
     x = np.arange(num_levels - 1)
-    plt.plot(x, d_adj_mean, label=f"{name} mean")
-    plt.fill_between(x, d_adj_mean - d_adj_std, d_adj_mean + d_adj_std, alpha=0.2, label=f"{name} +/-1sigma")
-    plt.title(f"{name}: Adjacent level {title_metric} distance (mean across features)")
-    plt.xlabel("Level l (distance between l and l+1)")
-    plt.ylabel(distance_label)
-    plt.legend()
-    plt.grid(True)
+    ax_adj.plot(x, d_adj_mean, label=f"{name} mean")
+    ax_adj.fill_between(x, d_adj_mean - d_adj_std, d_adj_mean + d_adj_std, alpha=0.2, label=f"{name} +/-1sigma")
+    ax_adj.set_title(f"Adjacent level {title_metric} distance (mean across features)")
+    ax_adj.set_xlabel("Level l (distance between l and l+1)")
+    ax_adj.set_ylabel(distance_label)
+    ax_adj.legend()
+    ax_adj.grid(True)
 
     # Plot 2: similarity heatmap (mean)
-    plt.figure()
-    plt.imshow(S, aspect="auto")
-    plt.title(f"{name}: Level {sim_label} matrix (mean across features)")
-    plt.xlabel("Level")
-    plt.ylabel("Level")
-    plt.colorbar(label=sim_label)
+    image = ax_sim.imshow(S, aspect="auto")
+    ax_sim.set_title(f"Level {sim_label} matrix (mean across features)")
+    ax_sim.set_xlabel("Level")
+    ax_sim.set_ylabel("Level")
+    fig.colorbar(image, ax=ax_sim, label=sim_label)
 
     # Plot 3: MDS embedding path
-    plt.figure()
-    plt.plot(Y[:, 0], Y[:, 1], marker="o")
-    for l in range(num_levels):
-        if l % 10 == 0 or l == num_levels - 1:
-            plt.text(Y[l, 0], Y[l, 1], str(l), fontsize=9)
-    plt.title(f"{name}: Classical MDS of levels (mean {title_metric} distance)")
-    plt.xlabel("MDS dimension 1")
-    plt.ylabel("MDS dimension 2")
-    plt.grid(True)
+    ax_mds.plot(Y[:, 0], Y[:, 1], marker="o")
+    # Every 10th level plus the last one is labelled; the indices are picked up front.
+    for l in np.unique(np.r_[0:num_levels:10, num_levels - 1]):
+        ax_mds.annotate(str(l), (Y[l, 0], Y[l, 1]), fontsize=9)
+    ax_mds.set_title(f"Classical MDS of levels (mean {title_metric} distance)")
+    ax_mds.set_xlabel("MDS dimension 1")
+    ax_mds.set_ylabel("MDS dimension 2")
+    ax_mds.grid(True)
 
-    return d_adj_all, d_adj_mean, d_adj_std
+    save_figure(fig, out_dir, f"{fig.get_label()}.png", interactive)
 
 
 
 
-def plot_adjacent_comparison_per_feature(V_naive, V_opt, binary_mode, mode="single", feature_index=0):
+def plot_adjacent_comparison_per_feature(d_naive_all, d_opt_all, binary_mode, out_dir, interactive,
+                                         mode="single", feature_index=0):
     """
     Adds a comparison plot for adjacent distances without aggregating away features.
 
+    d_naive_all / d_opt_all are the (features, levels - 1) adjacent distance curves
+    already computed by analyze_precomp_cim.
+
     mode:
       - "single": plot one feature (most readable)
       - "all": plot all features as faint lines + bold mean
     """
-    L, F, _ = V_naive.shape
-    x = np.arange(L - 1)
+    import matplotlib.pyplot as plt
 
-    # Compute adjacent distance curves for each feature
-    d_naive_all = np.zeros((F, L - 1))
-    d_opt_all   = np.zeros((F, L - 1))
-    for f in range(F):
-        d_naive_all[f] = consecutive_distances(V_naive[:, f, :], binary_mode)
-        d_opt_all[f]   = consecutive_distances(V_opt[:, f, :], binary_mode)
+    F, n_adjacent = d_naive_all.shape
+    x = np.arange(n_adjacent)
 
-    plt.figure()
+    fig = plt.figure(f"adjacent_distance_per_feature_{mode}")
 
     if mode == "single":
         f = int(feature_index)
@@ -268,10 +382,24 @@ def plot_adjacent_comparison_per_feature(V_naive, V_opt, binary_mode, mode="sing
     plt.ylabel("Hamming distance" if binary_mode else "1 - cosine similarity")
     plt.legend()
     plt.grid(True)
+    save_figure(fig, out_dir, f"{fig.get_label()}.png", interactive)
 
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Analyze inter-level distances of precomputed item memories.")
+    add_output_args(parser, os.path.join(BASE_DIR, "plots"))
+    parser.add_argument("--no-plots", action="store_true",
+                        help="Only print the distance summary; matplotlib is never imported.")
+    parser.add_argument("--quick", action="store_true",
+                        help="Skip the per-variant similarity heatmap and MDS; only adjacent distances are compared.")
+    args = parser.parse_args()
+    # Plotting helpers take out_dir=None as "do not plot".
+    out_dir = None if args.no_plots else args.out_dir
+    if out_dir is not None:
+        plt = import_pyplot(args.interactive)
+        os.makedirs(out_dir, exist_ok=True)
+
     V_naive = load_precomp_item_mem(CIM_NAIVE_FILE)
     if FORCE_BINARY_MODE is None:
         binary_mode = is_binary_vectors(V_naive)
@@ -283,44 +411,54 @@ def main():
     else:
         print(f"Warning: optimized file not found at {CIM_OPT_FILE}.")
 
-    d_naive_all, d_naive_mean, d_naive_std = analyze_precomp_cim("Naive CiM", V_naive, binary_mode)
+    d_naive_all, d_naive_mean, d_naive_std = analyze_precomp_cim(
+        "Naive CiM", V_naive, binary_mode, out_dir, args.interactive, full=not args.quick
+    )
 
     # Distance between min and max level (mean across features)
-    num_levels, num_features, _ = V_naive.shape
-    dist_naive = [pair_distance(V_naive[0, f], V_naive[num_levels - 1, f], binary_mode) for f in range(num_features)]
+    num_levels = V_naive.shape[1]
+    # Distances work on the last axis, so all features are compared in one call.
+    dist_naive = pair_distance(V_naive[:, 0], V_naive[:, num_levels - 1], binary_mode)
     metric_label = "Hamming" if binary_mode else "Cosine"
     print(f"{metric_label} distance between min and max level (mean across features):")
     print(f"  Naive CiM: {float(np.mean(dist_naive)):.6f}")
 
     if V_opt is not None:
-        d_opt_all, d_opt_mean, d_opt_std = analyze_precomp_cim("Optimized CiM", V_opt, binary_mode)
+        d_opt_all, d_opt_mean, d_opt_std = analyze_precomp_cim(
+            "Optimized CiM", V_opt, binary_mode, out_dir, args.interactive, full=not args.quick
+        )
 
-        num_levels_opt, num_features_opt, _ = V_opt.shape
-        dist_opt = [pair_distance(V_opt[0, f], V_opt[num_levels_opt - 1, f], binary_mode) for f in range(num_features_opt)]
+        num_levels_opt = V_opt.shape[1]
+        dist_opt = pair_distance(V_opt[:, 0], V_opt[:, num_levels_opt - 1], binary_mode)
         print(f"  Optimized CiM: {float(np.mean(dist_opt)):.6f}")
-        # Existing comparison plot (mean+/-std)
-        plt.figure()
-        x = np.arange(len(d_naive_mean))
-        plt.plot(x, d_naive_mean, label="Naive mean")
-        plt.fill_between(x, d_naive_mean - d_naive_std, d_naive_mean + d_naive_std, alpha=0.2)
-        plt.plot(x, d_opt_mean, label="Optimized mean")
-        plt.fill_between(x, d_opt_mean - d_opt_std, d_opt_mean + d_opt_std, alpha=0.2)
-        metric = "Hamming" if binary_mode else "cosine"
-        plt.title(f"Adjacent level {metric} distance: Naive vs Optimized (mean+/-std)")
-        plt.xlabel("Level l (distance between l and l+1)")
-        plt.ylabel("Hamming distance" if binary_mode else "1 - cosine similarity")
-        plt.legend()
-        plt.grid(True)
-
-        # NEW: comparison without averaging away features
-        plot_adjacent_comparison_per_feature(
-            V_naive, V_opt,
-            binary_mode,
-            mode=COMPARE_MODE,
-            feature_index=COMPARE_FEATURE_INDEX
-        )
+        if out_dir is not None:
+            # Existing comparison plot (mean+/-std)
+            fig = plt.figure("adjacent_distance_comparison")
+            x = np.arange(len(d_naive_mean))
+            plt.plot(x, d_naive_mean, label="Naive mean")
+            plt.fill_between(x, d_naive_mean - d_naive_std, d_naive_mean + d_naive_std, alpha=0.2)
+            plt.plot(x, d_opt_mean, label="Optimized mean")
+            plt.fill_between(x, d_opt_mean - d_opt_std, d_opt_mean + d_opt_std, alpha=0.2)
+            metric = "Hamming" if binary_mode else "cosine"
+            plt.title(f"Adjacent level {metric} distance: Naive vs Optimized (mean+/-std)")
+            plt.xlabel("Level l (distance between l and l+1)")
+            plt.ylabel("Hamming distance" if binary_mode else "1 - cosine similarity")
+            plt.legend()
+            plt.grid(True)
+            save_figure(fig, out_dir, f"{fig.get_label()}.png", args.interactive)
+
+            # NEW: comparison without averaging away features
+            plot_adjacent_comparison_per_feature(
+                d_naive_all, d_opt_all,
+                binary_mode,
+                out_dir,
+                args.interactive,
+                mode=COMPARE_MODE,
+                feature_index=COMPARE_FEATURE_INDEX
+            )
 
-    plt.show()
+    if out_dir is not None and args.interactive:
+        plt.show()
 
 
 if __name__ == "__main__":
@@ -1,25 +1,34 @@
 import csv
 import sys
+from operator import itemgetter
+
+
+def valid_rows(reader, i_acc):
+    for row in reader:
+        try:
+            acc = float(row[i_acc])
+        except (IndexError, ValueError):
+            continue  # falls kaputte Zeile
+        yield acc, row
+
 
 # Pfad zur CSV-Datei aus Argument oder Default
 path = sys.argv[1] if len(sys.argv) > 1 else "results/results.csv"
 
-best_row = None
-best_acc = float("-inf")
+best = None
 
 with open(path, newline="") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        try:
-            acc = float(row["Accuracy"])
-        except (KeyError, ValueError):
-            continue  # falls kaputte Zeile
-        if acc > best_acc:
-            best_acc = acc
-            best_row = row
+    # Plain reader with fixed column indices; no dict is built per row.
+    reader = csv.reader(f)
+    header = next(reader, [])
+    if {"D", "M", "Accuracy"} <= set(header):
+        i_d, i_m, i_acc = header.index("D"), header.index("M"), header.index("Accuracy")
+        # max keeps the first row on ties, like the old strict ">" comparison.
+        best = max(valid_rows(reader, i_acc), key=itemgetter(0), default=None)
 
-if best_row is not None:
+if best is not None:
+    best_row = best[1]
     # Ausgabe im Stil "D,M,Accuracy"
-    print(f'{best_row["D"]},{best_row["M"]},{best_row["Accuracy"]}')
+    print(f"{best_row[i_d]},{best_row[i_m]},{best_row[i_acc]}")
 else:
     print("Keine gültigen Daten in", path)
@@ -1,29 +1,36 @@
+import os
 import sys
-import random
 
-if len(sys.argv) != 3:
-    print("Usage: bitflipvektor.py <D> <M>")
-    exit(1)
+import numpy as np
 
-vector_size = int(sys.argv[1])
-num_vectors = int(sys.argv[2])
+from randomvector import to_bitstring_lines
 
-bit_flips = vector_size // 40   # proportional zur Vektorgröße
 
-def generate_random_vector(size):
-    return ''.join(random.choice('01') for _ in range(size))
+def generate_value_vectors(vector_size, num_vectors, flips, rng=None):
+    rng = np.random.default_rng() if rng is None else rng
+    vectors = np.empty((num_vectors, vector_size), dtype=np.uint8)
+    vectors[0] = rng.integers(0, 2, size=vector_size, dtype=np.uint8)
+    if num_vectors > 1:
+        # Each level flips `flips` random positions of the previous one (a position drawn
+        # twice flips back), so a level is the first vector XOR the running parity of the flips.
+        steps = num_vectors - 1
+        positions = rng.integers(0, vector_size, size=(steps, flips))
+        flat = (np.arange(steps)[:, None] * vector_size + positions).ravel()
+        parity = (np.bincount(flat, minlength=steps * vector_size) & 1).astype(np.uint8)
+        parity = np.bitwise_xor.accumulate(parity.reshape(steps, vector_size), axis=0)
+        vectors[1:] = vectors[0] ^ parity
+    return vectors
 
-def flip_bits(vector, flips):
-    vector_list = list(vector)
-    for _ in range(flips):
-        pos = random.randint(0, len(vector_list) - 1)
-        vector_list[pos] = '1' if vector_list[pos] == '0' else '0'
-    return ''.join(vector_list)
+def write_value_vectors(vector_size, num_vectors, root="."):
+    bit_flips = vector_size // 40   # proportional zur Vektorgröße
 
-with open('memoryfiles/value_vectors.txt', 'w') as f:
-    vector = generate_random_vector(vector_size)
-    f.write(vector + '\n')
+    with open(os.path.join(root, 'memoryfiles', 'value_vectors.txt'), 'wb') as f:
+        f.write(to_bitstring_lines(generate_value_vectors(vector_size, num_vectors, bit_flips)))
 
-    for _ in range(1, num_vectors):
-        vector = flip_bits(vector, bit_flips)
-        f.write(vector + '\n')
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: bitflipvektor.py <D> <M>")
+        exit(1)
+
+    write_value_vectors(int(sys.argv[1]), int(sys.argv[2]))
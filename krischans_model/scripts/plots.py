@@ -5,8 +5,7 @@ df = pd.read_csv("results/results.csv")
 
 # Accuracy vs M
 plt.figure()
-for D in sorted(df["D"].unique()):
-    sub = df[df["D"] == D]
+for D, sub in df.groupby("D", sort=True):
     plt.plot(sub["M"], sub["Accuracy"], marker='o', label=f"D={D}")
 
 plt.title("Accuracy vs CIM Levels (M)")
@@ -18,8 +17,7 @@ plt.savefig("results/plot_accuracy_vs_M.png", dpi=180)
 
 # Accuracy vs D
 plt.figure()
-for M in sorted(df["M"].unique()):
-    sub = df[df["M"] == M]
+for M, sub in df.groupby("M", sort=True):
     plt.plot(sub["D"], sub["Accuracy"], marker='o', label=f"M={M}")
 
 plt.title("Accuracy vs Vector Length (D)")
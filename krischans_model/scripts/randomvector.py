@@ -1,9 +1,26 @@
-import random
+import os
 import sys
 
+import numpy as np
 
-def generate_random_vector(size):
-    return "".join(random.choice("01") for _ in range(size))
+
+def generate_random_vectors(num_vectors, size, rng=None):
+    rng = np.random.default_rng() if rng is None else rng
+    return rng.integers(0, 2, size=(num_vectors, size), dtype=np.uint8)
+
+
+def to_bitstring_lines(vectors):
+    # One ASCII row per vector ("0"/"1" characters plus newline), built in a single buffer.
+    lines = np.empty((vectors.shape[0], vectors.shape[1] + 1), dtype=np.uint8)
+    lines[:, :-1] = vectors + ord("0")
+    lines[:, -1] = ord("\n")
+    return lines.tobytes()
+
+
+def write_position_vectors(vector_size, num_vectors, root="."):
+    path = os.path.join(root, "memoryfiles", "position-vectors.txt")
+    with open(path, "wb") as handle:
+        handle.write(to_bitstring_lines(generate_random_vectors(num_vectors, vector_size)))
 
 
 def main():
@@ -19,9 +36,7 @@ def main():
         print("Usage: randomvector.py [D] [NUM_VECTORS]")
         sys.exit(1)
 
-    with open("memoryfiles/position-vectors.txt", "w", encoding="ascii", newline="\n") as handle:
-        for _ in range(num_vectors):
-            handle.write(generate_random_vector(vector_size) + "\n")
+    write_position_vectors(vector_size, num_vectors)
 
     print(f"Done! {num_vectors} random vectors saved to position-vectors.txt.")
 
@@ -1,17 +1,29 @@
 import argparse
 import csv
+import os
 import re
 import shutil
 import subprocess
-import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import bitflipvector
+import randomvector
+
 
 NUM_FEATURES = 32
 WINDOW = 5
 DOWNSAMPLE = 1
 VALIDATION_RATIO = 0.0
 DEFAULT_LEVELS = " ".join(str(level) for level in range(21, 152, 10))
+# Parallel jobs run in build/repeats/<job>/ under the project root.
+WORK_ROOT = Path("build") / "repeats"
+# hdc_model is single-threaded, so one run per core; work dirs link to the project via
+# symlinks, which Windows only allows with extra privileges, so it stays sequential there.
+DEFAULT_JOBS = 1 if os.name == "nt" else (os.cpu_count() or 1)
+
+DATASET_RE = re.compile(rb"Dataset\s+(\d+)\s+accuracy:\s*([0-9]+(?:\.[0-9]+)?)%", re.IGNORECASE)
+OVERALL_RE = re.compile(rb"Accuracy:\s*([0-9]+(?:\.[0-9]+)?)%", re.IGNORECASE)
 
 CSV_HEADER = [
     "num_levels",
@@ -65,43 +77,55 @@ def ensure_csv_header(path: Path):
         csv.writer(handle).writerow(CSV_HEADER)
 
 
-def append_result(path: Path, row):
-    with path.open("a", encoding="utf-8", newline="") as handle:
-        csv.writer(handle).writerow(row)
+def regenerate_memory(work_dir: Path, dimension: int, num_levels: int):
+    # Same generators as the command-line scripts, called in-process to skip two interpreter starts.
+    randomvector.write_position_vectors(dimension, NUM_FEATURES, work_dir)
+    bitflipvector.write_value_vectors(dimension, num_levels, work_dir)
 
-def regenerate_memory(script_dir: Path, project_root: Path, dimension: int, num_levels: int):
-    randomvector_script = script_dir / "randomvector.py"
-    bitflip_script = script_dir / "bitflipvector.py"
-    python_bin = sys.executable
 
-    subprocess.run(
-        [python_bin, str(randomvector_script), str(dimension), str(NUM_FEATURES)],
-        cwd=project_root,
-        check=True,
-    )
-    subprocess.run(
-        [python_bin, str(bitflip_script), str(dimension), str(num_levels)],
-        cwd=project_root,
-        check=True,
-    )
+def prepare_work_dir(project_root: Path, work_dir: Path):
+    # The generator scripts and the binary always use memoryfiles/ relative to the working
+    # directory, so a parallel job gets a private memoryfiles/ and links to everything else.
+    (work_dir / "memoryfiles").mkdir(parents=True, exist_ok=True)
+    for entry in project_root.iterdir():
+        if entry.name in ("memoryfiles", WORK_ROOT.parts[0]):
+            continue
+        link = work_dir / entry.name
+        if not link.exists() and not link.is_symlink():
+            link.symlink_to(entry, target_is_directory=entry.is_dir())
 
 
-def parse_accuracies(stdout_text: str):
-    dataset_re = re.compile(r"Dataset\s+(\d+)\s+accuracy:\s*([0-9]+(?:\.[0-9]+)?)%", re.IGNORECASE)
-    overall_re = re.compile(r"^Accuracy:\s*([0-9]+(?:\.[0-9]+)?)%", re.IGNORECASE | re.MULTILINE)
-
+def parse_accuracies(lines):
+    # Consumes the model output line by line, so it can read straight from the process pipe;
+    # lines stay bytes (the patterns are byte patterns), so nothing is decoded.
     dataset_to_percent = {}
-    for match in dataset_re.finditer(stdout_text):
-        dataset_to_percent[int(match.group(1))] = float(match.group(2))
-
     overall_percent = None
-    match = overall_re.search(stdout_text)
-    if match:
-        overall_percent = float(match.group(1))
+    for line in lines:
+        match = DATASET_RE.search(line)
+        if match:
+            dataset_to_percent[int(match.group(1))] = float(match.group(2))
+        elif overall_percent is None:
+            match = OVERALL_RE.match(line)
+            if match:
+                overall_percent = float(match.group(1))
 
     return dataset_to_percent, overall_percent
 
 
+def run_model(cmd, cwd):
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    ) as proc:
+        dataset_acc, overall_acc = parse_accuracies(proc.stdout)
+        returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+    return dataset_acc, overall_acc
+
+
 def make_row(num_levels: int, dimension: int, accuracy_percent: float, info: str):
     accuracy = accuracy_percent / 100.0
     return [
@@ -127,6 +151,22 @@ def make_row(num_levels: int, dimension: int, accuracy_percent: float, info: str
     ]
 
 
+def job_rows(dimension: int, num_levels: int, repeat: int, results):
+    rows = []
+    for mode, dataset_acc, overall_acc in results:
+        for dataset_id in sorted(dataset_acc):
+            info = (
+                f"model=krischan,scope=dataset,mode={mode},dataset={dataset_id},"
+                f"repeat={repeat}"
+            )
+            rows.append(make_row(num_levels, dimension, dataset_acc[dataset_id], info))
+
+        if overall_acc is not None:
+            info = f"model=krischan,scope=overall,mode={mode},repeat={repeat}"
+            rows.append(make_row(num_levels, dimension, overall_acc, info))
+    return rows
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Run Krischans model repeatedly with regenerated IM/CM and log ResultManager-like CSV rows."
@@ -144,6 +184,13 @@ def main():
     parser.add_argument("--repeats", type=int, default=1, help="Repetitions per (D, M) with mode fixed to 1.")
     parser.add_argument("--output", default="results/repeats_results.csv", help="CSV path relative to krischans_model.")
     parser.add_argument("--skip-build", action="store_true", help="Skip build step.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Runs executed in parallel; each parallel run uses its own directory under build/repeats. "
+        "Defaults to one run per core (1 on Windows).",
+    )
     args = parser.parse_args()
 
     d_values = parse_int_list(args.d_values)
@@ -151,6 +198,8 @@ def main():
     modes = [1]
     if not d_values or not m_values:
         raise ValueError("d-values and m-values must be non-empty.")
+    if args.jobs < 1:
+        raise ValueError("jobs must be at least 1.")
 
     script_dir = Path(__file__).resolve().parent
     project_root = script_dir.parent
@@ -164,37 +213,45 @@ def main():
     binary = find_binary(project_root)
     ensure_csv_header(output_path)
 
-    for dimension in d_values:
-        for num_levels in m_values:
-            for repeat in range(args.repeats):
-                regenerate_memory(script_dir, project_root, dimension, num_levels)
-
-                for mode in modes:
-                    print(f"run: D={dimension} M={num_levels} mode={mode} repeat={repeat}")
-                    completed = subprocess.run(
-                        [str(binary), str(dimension), str(num_levels), str(mode)],
-                        cwd=project_root,
-                        check=True,
-                        capture_output=True,
-                        text=True,
-                    )
-
-                    dataset_acc, overall_acc = parse_accuracies(completed.stdout)
-                    if not dataset_acc and overall_acc is None:
-                        raise RuntimeError("Could not parse accuracy from model output.")
-
-                    for dataset_id in sorted(dataset_acc):
-                        info = (
-                            f"model=krischan,scope=dataset,mode={mode},dataset={dataset_id},"
-                            f"repeat={repeat}"
-                        )
-                        row = make_row(num_levels, dimension, dataset_acc[dataset_id], info)
-                        append_result(output_path, row)
-
-                    if overall_acc is not None:
-                        info = f"model=krischan,scope=overall,mode={mode},repeat={repeat}"
-                        row = make_row(num_levels, dimension, overall_acc, info)
-                        append_result(output_path, row)
+    def run_job(dimension, num_levels, repeat):
+        if args.jobs > 1:
+            work_dir = project_root / WORK_ROOT / f"D{dimension}_M{num_levels}_r{repeat}"
+            prepare_work_dir(project_root, work_dir)
+        else:
+            work_dir = project_root
+        regenerate_memory(work_dir, dimension, num_levels)
+
+        results = []
+        for mode in modes:
+            print(f"run: D={dimension} M={num_levels} mode={mode} repeat={repeat}")
+            dataset_acc, overall_acc = run_model(
+                [str(binary), str(dimension), str(num_levels), str(mode)], work_dir
+            )
+            if not dataset_acc and overall_acc is None:
+                raise RuntimeError("Could not parse accuracy from model output.")
+            results.append((mode, dataset_acc, overall_acc))
+        return results
+
+    jobs = [
+        (dimension, num_levels, repeat)
+        for dimension in d_values
+        for num_levels in m_values
+        for repeat in range(args.repeats)
+    ]
+    # The CSV stays open for the whole sweep; each finished job is written and flushed in one batch.
+    with output_path.open("a", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            futures = [pool.submit(run_job, *job) for job in jobs]
+            try:
+                # Rows are written in sweep order, so the CSV matches a sequential run.
+                for (dimension, num_levels, repeat), future in zip(jobs, futures):
+                    writer.writerows(job_rows(dimension, num_levels, repeat, future.result()))
+                    handle.flush()
+            except BaseException:
+                # Stop the sweep at the first failure instead of draining the queue.
+                pool.shutdown(cancel_futures=True)
+                raise
 
     print(f"Done. Results appended to {output_path}")
 